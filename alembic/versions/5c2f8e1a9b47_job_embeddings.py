@@ -0,0 +1,39 @@
+"""Job embeddings with HNSW index
+
+Revision ID: 5c2f8e1a9b47
+Revises: aeeb5da16326
+Create Date: 2026-10-18 10:12:03.418276
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import pgvector.sqlalchemy
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2f8e1a9b47'
+down_revision: Union[str, None] = 'aeeb5da16326'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+    op.add_column('jobs', sa.Column('embedding', pgvector.sqlalchemy.Vector(dim=1536), nullable=True))
+    op.add_column('jobs', sa.Column('similarity_score', sa.Float(), nullable=True))
+    # HNSW keeps top-k cosine queries fast as the table grows; rows without an embedding are not indexed
+    op.create_index(
+        'ix_jobs_embedding_hnsw', 'jobs', ['embedding'],
+        unique=False,
+        postgresql_using='hnsw',
+        postgresql_with={'m': 16, 'ef_construction': 64},
+        postgresql_ops={'embedding': 'vector_cosine_ops'},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_jobs_embedding_hnsw', table_name='jobs', postgresql_using='hnsw')
+    op.drop_column('jobs', 'similarity_score')
+    op.drop_column('jobs', 'embedding')
@@ -0,0 +1,28 @@
+"""Add APPLYING job status
+
+Revision ID: b3d91f6e2c74
+Revises: 9e4b7d3c2a18
+Create Date: 2026-10-18 16:20:07.114263
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3d91f6e2c74'
+down_revision: Union[str, None] = '9e4b7d3c2a18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # ADD VALUE can't run inside a transaction block on older Postgres
+    with op.get_context().autocommit_block():
+        op.execute("ALTER TYPE jobstatus ADD VALUE IF NOT EXISTS 'APPLYING' AFTER 'TAILORED'")
+
+
+def downgrade() -> None:
+    # Postgres can't drop an enum value; put claimed jobs back so the old code can pick them up
+    op.execute("UPDATE jobs SET status = 'TAILORED' WHERE status = 'APPLYING'")
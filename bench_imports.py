@@ -0,0 +1,72 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Worker entry points and the modules they must not load just by being imported
+ENTRY_POINTS = {
+    "src.intelligence.runner": ["langchain_openai", "langchain_anthropic", "weasyprint", "playwright"],
+    "src.agent.runner": ["langchain_openai", "langchain_anthropic", "weasyprint", "playwright"],
+    "src.scout.details": ["langchain_openai", "langchain_anthropic", "langgraph", "weasyprint", "playwright"],
+    "src.worker": ["langchain_openai", "langchain_anthropic", "langgraph", "weasyprint", "playwright"],
+    "src.api.main": ["langchain_openai", "langchain_anthropic", "langgraph", "weasyprint", "playwright"],
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {forbidden!r} if m in sys.modules]}}))
+"""
+
+def measure(module: str, forbidden: list, runs: int) -> dict:
+    """Import `module` in fresh interpreters; report the best time and any forbidden modules it pulled in."""
+    env = {**os.environ, "PYTHONPATH": os.getcwd()}
+    results = []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-c", PROBE.format(module=module, forbidden=forbidden)],
+            capture_output=True, text=True, env=env,
+        )
+        if proc.returncode != 0:
+            return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr else "import failed"}
+        results.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return {"seconds": min(r["seconds"] for r in results), "loaded": results[0]["loaded"]}
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure worker import time and guard against eager heavy imports.")
+    parser.add_argument("modules", nargs="*", help="Entry points to check (default: all workers and the API)")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh interpreters per module; the fastest is reported")
+    parser.add_argument(
+        "--budget", type=float, default=float(os.getenv("IMPORT_BUDGET_SECONDS", 2.0)),
+        help="Fail when an entry point takes longer than this many seconds to import"
+    )
+    args = parser.parse_args()
+
+    failed = False
+    started = time.perf_counter()
+    for module in args.modules or ENTRY_POINTS:
+        result = measure(module, ENTRY_POINTS.get(module, []), args.runs)
+        if "error" in result:
+            failed = True
+            print(f"FAIL {module}: {result['error']}")
+            continue
+
+        problems = []
+        if result["loaded"]:
+            problems.append(f"eagerly imports {', '.join(result['loaded'])}")
+        if result["seconds"] > args.budget:
+            problems.append(f"over the {args.budget:.1f}s budget")
+        failed = failed or bool(problems)
+
+        status = "FAIL" if problems else "ok"
+        print(f"{status:4} {module}: {result['seconds']:.2f}s" + (f" ({'; '.join(problems)})" if problems else ""))
+
+    print(f"Checked in {time.perf_counter() - started:.1f}s")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
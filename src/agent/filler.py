@@ -1,7 +1,6 @@
 import logging
 import asyncio
-from typing import Optional
-from playwright.async_api import Page
+from typing import TYPE_CHECKING, Optional
 from src.scout.browser import BrowserSession
 from src.analytics.logger import log_event
 from src.database.models import Application, Job
@@ -11,12 +10,15 @@ from src.agent.hitl import HITLManager
 from src.agent.vision import VisionEngine
 from src.intelligence.engine import IntelligenceEngine
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 logger = logging.getLogger(__name__)
 
 class FormFiller:
     def __init__(self, engine: IntelligenceEngine, headless: bool = False, session_file: Optional[str] = None):
         self.browser_session = BrowserSession(headless=headless, session_file=session_file)
-        self.page: Optional[Page] = None
+        self.page: Optional["Page"] = None
         self.hitl = HITLManager()
         self.vision = VisionEngine(engine)
 
@@ -44,9 +46,9 @@ class FormFiller:
             logger.error(f"Navigation failed: {e}")
             raise
 
-    async def fill_application(self, application: Application):
+    async def fill_application(self, application: Application) -> bool:
         """
-        Orchestrate the form filling process.
+        Orchestrate the form filling process. Returns True once the application is submitted.
         For Phase 3 MVP, this just navigates and simulates basic interaction.
         """
         await self.navigate_to_application(application)
@@ -76,10 +78,13 @@ class FormFiller:
             logger.info(f"APPROVED! Submitting application for job {application.job_id}...")
             # await self.submit()
             log_event("application_submitted", {"job_id": application.job_id})
+            submitted = True
         else:
             logger.warning(f"REJECTED. Skipping submission for job {application.job_id}.")
+            submitted = False
         
         logger.info(f"Finished processing application for job {application.job_id}")
+        return submitted
 
 
     async def analyze_page(self, application: Application) -> str:
@@ -4,36 +4,69 @@ import logging
 import os
 from dotenv import load_dotenv
 from redis.asyncio import Redis
-from sqlalchemy import select
+from datetime import datetime, timezone
+from sqlalchemy import select, update
 from src.database.config import async_session_maker
-from src.database.models import Application
+from src.database.models import Application, Job, JobStatus
 from src.agent.filler import FormFiller
 from src.intelligence.engine import IntelligenceEngine
+from src.intelligence.ratelimit import LLMRateLimiter
+from src.queues.arq_queue import ArqQueue
+from src.queues.factory import get_queue
 
 load_dotenv()
 logger = logging.getLogger(__name__)
 
 class AgentRunner:
-    def __init__(self):
+    def __init__(self, fillers: int = 1):
         self.redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
-        self.engine = IntelligenceEngine(model_provider="openai")
-        self.filler = FormFiller(engine=self.engine, headless=False) # Headful for debugging/Vision
+        self.apply_queue = get_queue(self.redis, "apply_queue")
+        self.engine = IntelligenceEngine(model_provider="openai", rate_limiter=LLMRateLimiter.from_env())
+        # Headful by default for debugging/Vision. Each filler drives one page, so an application
+        # holds one for its whole run; the arq worker sizes the pool to its max_jobs
+        headless = os.getenv("AGENT_HEADLESS", "false").lower() in ("1", "true", "yes")
+        self.fillers = [FormFiller(engine=self.engine, headless=headless) for _ in range(fillers)]
+        self._idle_fillers: asyncio.Queue = asyncio.Queue()
+        for filler in self.fillers:
+            self._idle_fillers.put_nowait(filler)
 
     async def run(self):
+        if isinstance(self.apply_queue, ArqQueue):
+            raise RuntimeError("QUEUE_TRANSPORT=arq hands apply_queue to arq; run `arq src.worker.AgentWorker` instead")
         logger.info("Agent Runner started. Listening on apply_queue...")
+        stop = asyncio.Event()
+        reaper = asyncio.create_task(self.apply_queue.run_reaper(stop))
         try:
             while True:
-                item = await self.redis.brpop("apply_queue", timeout=5)
-                if not item:
+                message = await self.apply_queue.pop(timeout=5)
+                if not message:
                     continue
                 
-                _, app_id = item
+                app_id = message.payload
                 try:
-                    await self.process_application(int(app_id))
+                    # HITL approval can take a while; the lease is kept alive until we finish
+                    async with self.apply_queue.lease(message):
+                        await self.process_application(int(app_id))
+                    await self.apply_queue.ack(message)
                 except Exception as e:
                     logger.error(f"Failed to process application {app_id}: {e}", exc_info=True)
+                    await self.apply_queue.nack(message, repr(e))
         finally:
-            await self.filler.stop()
+            stop.set()
+            await reaper
+            await self.close()
+
+    async def start(self):
+        """Launch every filler's browser up front so the first applications don't pay for it."""
+        await asyncio.gather(*(filler.start() for filler in self.fillers))
+
+    async def close(self):
+        for filler in self.fillers:
+            await filler.stop()
+        if self.engine.rate_limiter:
+            await self.engine.rate_limiter.close()
+        await self.apply_queue.close()
+        await self.redis.aclose()
 
     async def process_application(self, app_id: int):
         logger.info(f"Processing application ID: {app_id}")
@@ -49,8 +82,49 @@ class AgentRunner:
             
             # Lazy load job to ensure URL is available
             await session.refresh(application, ["job"])
-            
-            await self.filler.fill_application(application)
+
+            # Every transport redelivers (retries, dead workers), so claim the job in one conditional
+            # UPDATE: only a TAILORED job is filled, and only by the worker whose UPDATE flipped it
+            claimed = await session.execute(
+                update(Job)
+                .where(Job.id == application.job_id, Job.status == JobStatus.TAILORED)
+                .values(status=JobStatus.APPLYING)
+            )
+            await session.commit()
+            if claimed.rowcount == 0:
+                await session.refresh(application.job, ["status"])
+                logger.warning(
+                    f"Skipping application {app_id}: job {application.job_id} is already {application.job.status.value}"
+                )
+                return
+            await session.refresh(application, ["job"])
+
+            filler = await self._idle_fillers.get()
+            try:
+                submitted = await filler.fill_application(application)
+            except (Exception, asyncio.CancelledError):
+                # Failed or timed out (e.g. waiting on review) before reaching submission: release the
+                # claim so the retry can fill it. A worker that dies mid-fill leaves the job APPLYING
+                # for a human to check
+                await asyncio.shield(self._release_claim(session, application.job_id))
+                raise
+            finally:
+                self._idle_fillers.put_nowait(filler)
+
+            # From here on a failure must not release the claim: the form may already be submitted
+            if submitted:
+                application.job.status = JobStatus.APPLIED
+                application.submitted_at = datetime.now(timezone.utc)
+            else:
+                application.job.status = JobStatus.REJECTED
+            await session.commit()
+
+    async def _release_claim(self, session, job_id: int):
+        await session.rollback()
+        await session.execute(
+            update(Job).where(Job.id == job_id, Job.status == JobStatus.APPLYING).values(status=JobStatus.TAILORED)
+        )
+        await session.commit()
 
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
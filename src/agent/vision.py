@@ -1,11 +1,13 @@
 import base64
 import logging
-from typing import Dict, Any, List
-from playwright.async_api import Page
+from typing import TYPE_CHECKING, Dict, Any, List
 from langchain_core.messages import HumanMessage, SystemMessage
 from src.intelligence.engine import IntelligenceEngine
 from src.agent.models import UIAction
 
+if TYPE_CHECKING:
+    from playwright.async_api import Page
+
 logger = logging.getLogger(__name__)
 
 class VisionEngine:
@@ -14,9 +16,10 @@ class VisionEngine:
     capturing screenshots, and extracting the accessibility tree.
     """
     def __init__(self, engine: IntelligenceEngine):
+        self.engine = engine
         self.llm = engine.llm
 
-    async def get_next_action(self, page: Page, user_context: str) -> UIAction:
+    async def get_next_action(self, page: "Page", user_context: str) -> UIAction:
         """
         Analyzes the page state and returns the next action to take.
         """
@@ -55,10 +58,10 @@ class VisionEngine:
         ]
         
         structured_llm = self.llm.with_structured_output(UIAction)
-        action = await structured_llm.ainvoke(messages)
+        action = await self.engine.ainvoke(structured_llm, messages)
         return action
 
-    async def capture_state(self, page: Page) -> Dict[str, Any]:
+    async def capture_state(self, page: "Page") -> Dict[str, Any]:
         """
         Captures the current state of the page:
         1. Screenshot (base64)
@@ -83,7 +86,7 @@ class VisionEngine:
             "url": page.url
         }
 
-    async def highlight_element(self, page: Page, selector: str):
+    async def highlight_element(self, page: "Page", selector: str):
         """Debug helper to highlight an element."""
         try:
             locator = page.locator(selector).first
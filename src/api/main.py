@@ -1,7 +1,7 @@
 import logging
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from src.api.routes import jobs, applications, stats
+from src.api.routes import jobs, applications, stats, queues
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -27,6 +27,11 @@ app.add_middleware(
 app.include_router(jobs.router, prefix="/api/jobs", tags=["Jobs"])
 app.include_router(applications.router, prefix="/api/applications", tags=["Applications"])
 app.include_router(stats.router, prefix="/api/stats", tags=["Stats"])
+app.include_router(queues.router, prefix="/api/queues", tags=["Queues"])
+
+@app.on_event("shutdown")
+async def shutdown():
+    await queues.close_queues()
 
 @app.get("/")
 async def root():
@@ -1 +1 @@
-from . import jobs, applications, stats
+from . import jobs, applications, stats, queues
@@ -2,8 +2,10 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, desc
+from sqlalchemy.orm import undefer
 from src.database.config import get_db
 from src.database.models import Job, JobStatus
+from src.intelligence.embeddings import top_k_similar
 
 router = APIRouter()
 
@@ -32,3 +34,17 @@ async def get_job(job_id: int, db: AsyncSession = Depends(get_db)):
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
     return job
+
+@router.get("/{job_id}/similar")
+async def similar_jobs(job_id: int, k: int = 10, db: AsyncSession = Depends(get_db)):
+    job = await db.get(Job, job_id, options=[undefer(Job.embedding)])
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.embedding is None:
+        raise HTTPException(status_code=409, detail="Job has no embedding yet")
+
+    matches = await top_k_similar(db, job.embedding, k=k, exclude_job_id=job.id)
+    return [
+        {"id": match.id, "title": match.title, "company": match.company, "url": match.url, "similarity": similarity}
+        for match, similarity in matches
+    ]
@@ -0,0 +1,55 @@
+import os
+from typing import Dict
+from fastapi import APIRouter, HTTPException
+from redis.asyncio import Redis
+from src.queues.backpressure import BackpressureGate
+from src.queues.factory import get_queue
+from src.queues.reliable import ReliableQueue
+from src.queues.streams import StreamQueue
+
+router = APIRouter()
+redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+
+QUEUE_NAMES = ("discovered_job_queue", "raw_job_queue", "apply_queue")
+
+# One instance per queue for the life of the app: the arq transport opens a connection pool per instance
+_queues: Dict[str, ReliableQueue] = {}
+
+def _queue(name: str) -> ReliableQueue:
+    if name not in QUEUE_NAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown queue {name}")
+    if name not in _queues:
+        _queues[name] = get_queue(redis, name, consumer="api")
+    return _queues[name]
+
+async def close_queues():
+    for queue in _queues.values():
+        await queue.close()
+    _queues.clear()
+
+@router.get("/")
+async def list_queues():
+    """Depth of every queue, plus its watermarks and how long producers have been throttled on it."""
+    result = {}
+    for name in QUEUE_NAMES:
+        queue = _queue(name)
+        depth = await queue.depth()
+        result[name] = {**depth, "backpressure": await BackpressureGate.from_env(queue).metrics(depth)}
+    return result
+
+@router.get("/{name}/consumers")
+async def list_consumers(name: str):
+    """Per-consumer pending counts, idle time and lag. Only the streams transport tracks consumers."""
+    queue = _queue(name)
+    if not isinstance(queue, StreamQueue):
+        raise HTTPException(status_code=400, detail="Consumer stats need QUEUE_TRANSPORT=streams")
+    return await queue.consumer_stats()
+
+@router.get("/{name}/dead")
+async def list_dead_letters(name: str, limit: int = 50):
+    return await _queue(name).dead_letters(limit)
+
+@router.post("/{name}/dead/requeue")
+async def requeue_dead_letters(name: str, limit: int = 50):
+    """Give dead-lettered items a fresh set of attempts, oldest first."""
+    return {"requeued": await _queue(name).requeue_dead(limit)}
@@ -1,13 +1,19 @@
 from datetime import datetime, timezone
 import enum
 from typing import Optional, List
-from sqlalchemy import Column, String, Integer, DateTime, JSON, Enum, ForeignKey, Text
+from pgvector.sqlalchemy import Vector
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Enum, ForeignKey, Text, Float
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database.config import Base
 
+# Matches text-embedding-3-small; the deterministic hashing embedder uses the same width
+EMBEDDING_DIM = 1536
+
 class JobStatus(str, enum.Enum):
     DISCOVERED = "DISCOVERED"
     TAILORED = "TAILORED"
+    # Claimed by an agent worker; the form may already be submitted, so it is never filled again
+    APPLYING = "APPLYING"
     APPLIED = "APPLIED"
     REJECTED = "REJECTED"
     INTERVIEW = "INTERVIEW"
@@ -34,6 +40,11 @@ class Job(Base):
     )
     
     requires_sponsorship: Mapped[bool] = mapped_column(default=False)
+
+    # Semantic pre-ranking (cosine similarity to the user profile)
+    # Deferred so list queries don't ship 1536 floats per row; load with undefer(Job.embedding)
+    embedding: Mapped[Optional[List[float]]] = mapped_column(Vector(EMBEDDING_DIM), nullable=True, deferred=True)
+    similarity_score: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
     
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
@@ -47,6 +58,29 @@ class Job(Base):
     applications: Mapped[List["Application"]] = relationship(
         "Application", back_populates="job", cascade="all, delete-orphan"
     )
+    requirements: Mapped[Optional["JobRequirementsRecord"]] = relationship(
+        "JobRequirementsRecord", back_populates="job", cascade="all, delete-orphan", uselist=False
+    )
+
+class JobRequirementsRecord(Base):
+    """Requirements extracted alongside the fit analysis, stored so later stages can reuse them."""
+    __tablename__ = "job_requirements"
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    job_id: Mapped[int] = mapped_column(ForeignKey("jobs.id"), unique=True, index=True)
+
+    required_skills: Mapped[List[str]] = mapped_column(JSON, default=list)
+    preferred_skills: Mapped[List[str]] = mapped_column(JSON, default=list)
+    experience_level: Mapped[str] = mapped_column(String)
+    years_experience: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)
+    remote_policy: Mapped[str] = mapped_column(String)
+    sponsorship_available: Mapped[bool] = mapped_column(default=False)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), default=lambda: datetime.now(timezone.utc)
+    )
+
+    job: Mapped["Job"] = relationship("Job", back_populates="requirements")
 
 class Application(Base):
     __tablename__ = "applications"
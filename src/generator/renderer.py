@@ -1,6 +1,5 @@
 import os
 from jinja2 import Environment, FileSystemLoader
-from weasyprint import HTML
 from src.intelligence.models import UserProfile, TailoredContent
 
 class PDFGenerator:
@@ -19,5 +18,8 @@ class PDFGenerator:
             job_title=job_title
         )
         
+        # WeasyPrint pulls in its whole layout stack on import; only load it once a PDF is needed
+        from weasyprint import HTML
+
         HTML(string=html_content).write_pdf(output_path)
         return output_path
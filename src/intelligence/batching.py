@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+from src.intelligence.engine import FIT_BATCH_MODES, IntelligenceEngine
+from src.intelligence.models import FitAnalysis, UserProfile
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _FitRequest:
+    job_description: str
+    user_profile: UserProfile
+    future: asyncio.Future
+
+class FitBatcher:
+    """
+    Collects concurrent analyze_fit requests into micro-batches bounded by `max_batch_size` and
+    `max_wait` seconds, then evaluates each batch with IntelligenceEngine.analyze_fit_batch.
+    Callers await their own result; a failing job raises only in its own caller.
+    """
+    def __init__(self, engine: IntelligenceEngine, max_batch_size: int = 8, max_wait: float = 0.2, mode: str = "concurrent"):
+        # Fail at startup rather than on every batch
+        if mode not in FIT_BATCH_MODES:
+            raise ValueError(f"Unknown fit batch mode '{mode}', expected one of {', '.join(FIT_BATCH_MODES)}")
+        self.engine = engine
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.mode = mode
+        self.batches = 0
+        self.jobs = 0
+        self._queue: "asyncio.Queue[_FitRequest]" = asyncio.Queue()
+        self._worker: Optional[asyncio.Task] = None
+        self._in_flight: set = set()
+
+    async def submit(self, job_description: str, user_profile: UserProfile) -> FitAnalysis:
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put(_FitRequest(job_description, user_profile, future))
+        return await future
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            # Run the batch without blocking collection of the next one
+            task = asyncio.create_task(self._evaluate(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _evaluate(self, batch: List[_FitRequest]):
+        # A batch shares one profile; group in case callers use several
+        groups = {}
+        for request in batch:
+            groups.setdefault(id(request.user_profile), []).append(request)
+
+        for requests in groups.values():
+            try:
+                results = await self.engine.analyze_fit_batch(
+                    [request.job_description for request in requests], requests[0].user_profile, mode=self.mode
+                )
+            except Exception as e:
+                results = [e] * len(requests)
+
+            self.batches += 1
+            self.jobs += len(requests)
+            logger.debug(f"Evaluated fit batch of {len(requests)} jobs")
+            for request, result in zip(requests, results):
+                if request.future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    request.future.set_exception(result)
+                else:
+                    request.future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "batches": self.batches,
+            "jobs": self.jobs,
+            "avg_batch_size": self.jobs / self.batches if self.batches else 0.0,
+        }
+
+    async def close(self):
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._in_flight:
+            await asyncio.gather(*self._in_flight, return_exceptions=True)
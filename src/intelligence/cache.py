@@ -0,0 +1,164 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import sqlite3
+import time
+from typing import Optional, Type, TypeVar
+from pydantic import BaseModel
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+class RedisCacheBackend:
+    """Entries are plain keys with a TTL; a sorted set indexes them by last write for size-bounded eviction."""
+    def __init__(self, redis: Redis, max_entries: int = 50_000, key_prefix: str = "llm_cache"):
+        self.redis = redis
+        self.max_entries = max_entries
+        self.key_prefix = key_prefix
+        self.index_key = f"{key_prefix}:index"
+
+    async def get(self, key: str) -> Optional[str]:
+        return await self.redis.get(f"{self.key_prefix}:{key}")
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(f"{self.key_prefix}:{key}", value, ex=ttl_seconds)
+            pipe.zadd(self.index_key, {key: time.time()})
+            pipe.zcard(self.index_key)
+            *_, size = await pipe.execute()
+
+        if size > self.max_entries:
+            evicted = await self.redis.zpopmin(self.index_key, size - self.max_entries)
+            if evicted:
+                await self.redis.delete(*(f"{self.key_prefix}:{member}" for member, _ in evicted))
+
+    async def close(self):
+        await self.redis.aclose()
+
+class SQLiteCacheBackend:
+    """Local single-file cache. Expired rows are ignored on read; least recently used rows are evicted past max_entries."""
+    def __init__(self, path: str = "data/cache/llm_cache.sqlite", max_entries: int = 50_000):
+        self.path = path
+        self.max_entries = max_entries
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_accessed_at ON llm_cache (accessed_at)")
+        self._conn.commit()
+        self._lock = asyncio.Lock()
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value FROM llm_cache WHERE key = ? AND expires_at > ?", (key, now)
+        ).fetchone()
+        if row:
+            self._conn.execute("UPDATE llm_cache SET accessed_at = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+        return row[0] if row else None
+
+    def _set(self, key: str, value: str, ttl_seconds: int):
+        now = time.time()
+        self._conn.execute(
+            "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (key, value, now + ttl_seconds, now),
+        )
+        self._conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (now,))
+        self._conn.execute(
+            "DELETE FROM llm_cache WHERE key IN ("
+            "SELECT key FROM llm_cache ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+            (self.max_entries,),
+        )
+        self._conn.commit()
+
+    async def get(self, key: str) -> Optional[str]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl_seconds: int):
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value, ttl_seconds)
+
+    async def close(self):
+        self._conn.close()
+
+class LLMCache:
+    """
+    Content-addressed cache for structured LLM results.
+
+    Keys hash the prompt template version, model name and normalized inputs, so the same posting
+    re-scouted under a new id or retried after a crash is answered without a model call.
+    """
+    def __init__(self, backend, ttl_seconds: int = 30 * 24 * 3600):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMCache"]:
+        """Build the cache from LLM_CACHE_BACKEND (redis, sqlite or none)."""
+        backend_name = os.getenv("LLM_CACHE_BACKEND", "redis")
+        max_entries = int(os.getenv("LLM_CACHE_MAX_ENTRIES", 50_000))
+        ttl_seconds = int(os.getenv("LLM_CACHE_TTL_SECONDS", 30 * 24 * 3600))
+
+        if backend_name == "none":
+            return None
+        if backend_name == "sqlite":
+            backend = SQLiteCacheBackend(os.getenv("LLM_CACHE_PATH", "data/cache/llm_cache.sqlite"), max_entries)
+        elif backend_name == "redis":
+            redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+            backend = RedisCacheBackend(redis, max_entries)
+        else:
+            raise ValueError(f"Unknown LLM_CACHE_BACKEND '{backend_name}'")
+        return cls(backend, ttl_seconds)
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        return re.sub(r"\s+", " ", text or "").strip().lower()
+
+    @classmethod
+    def make_key(cls, namespace: str, prompt_version: str, model_name: str, *parts: str) -> str:
+        digest = hashlib.sha256()
+        for part in (namespace, prompt_version, model_name, *parts):
+            digest.update(part.encode())
+            digest.update(b"\x00")
+        return f"{namespace}:{digest.hexdigest()}"
+
+    async def get(self, key: str, model_cls: Type[ModelT]) -> Optional[ModelT]:
+        try:
+            raw = await self.backend.get(key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            raw = None
+
+        if raw is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return model_cls.model_validate_json(raw)
+
+    async def set(self, key: str, value: BaseModel):
+        try:
+            await self.backend.set(key, value.model_dump_json(), self.ttl_seconds)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+    async def close(self):
+        await self.backend.close()
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import math
+import os
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import EMBEDDING_DIM, Job, JobStatus
+from src.intelligence.models import UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Only the head of a posting is embedded; it carries the role, stack and seniority
+MAX_EMBED_CHARS = 8000
+
+class Embedder:
+    """Pluggable text embedder. Implementations return L2-normalized vectors of `dimension` floats."""
+    dimension: int = EMBEDDING_DIM
+    name: str = "base"
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        raise NotImplementedError
+
+class HashingEmbedder(Embedder):
+    """
+    Local, deterministic embedder (signed feature hashing of unigrams and bigrams).
+    No network or model weights, so it is stable across runs and suitable for tests.
+    """
+    name = "hashing"
+
+    def __init__(self, dimension: int = EMBEDDING_DIM):
+        self.dimension = dimension
+
+    def _embed_one(self, text: str) -> List[float]:
+        tokens = re.findall(r"[a-z0-9+#.]+", text.lower())
+        features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        vector = [0.0] * self.dimension
+        for feature in features:
+            h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+            vector[h % self.dimension] += 1.0 if (h >> 63) & 1 else -1.0
+        norm = math.sqrt(sum(v * v for v in vector))
+        return [v / norm for v in vector] if norm else vector
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed_one(text) for text in texts]
+
+class OpenAIEmbedder(Embedder):
+    name = "openai"
+
+    def __init__(self, model: str = "text-embedding-3-small", dimension: int = EMBEDDING_DIM):
+        from langchain_openai import OpenAIEmbeddings
+
+        self.dimension = dimension
+        self.client = OpenAIEmbeddings(model=model, dimensions=dimension)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        return await self.client.aembed_documents(texts)
+
+def get_embedder() -> Embedder:
+    """
+    Select the embedder from EMBEDDER (hashing or openai). Defaults to openai when OPENAI_API_KEY is
+    set: hashing similarities are keyword overlap plus collision noise (they go negative on unrelated
+    text), fine for tests and ordering but not for rejecting jobs.
+    """
+    name = os.getenv("EMBEDDER") or ("openai" if os.getenv("OPENAI_API_KEY") else "hashing")
+    if name == "openai":
+        return OpenAIEmbedder()
+    if name == "hashing":
+        return HashingEmbedder()
+    raise ValueError(f"Unknown EMBEDDER '{name}'")
+
+def cosine_similarity(a: Sequence[float], b: Sequence[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+def job_text(job: Job) -> str:
+    description = job.description_text or job.description_html or ""
+    return f"{job.title}\n{job.company}\n{description}"[:MAX_EMBED_CHARS]
+
+def job_data_text(job_data: dict) -> str:
+    """job_text for a queued job_data dict, so a job embeds the same before and after it is stored."""
+    description = job_data.get("description_text") or job_data.get("description_html") or ""
+    return f"{job_data.get('title')}\n{job_data.get('company')}\n{description}"[:MAX_EMBED_CHARS]
+
+def profile_text(profile: UserProfile) -> str:
+    return "\n".join([", ".join(profile.skills), profile.experience_summary, profile.resume_raw_text])[:MAX_EMBED_CHARS]
+
+async def top_k_similar(
+    session: AsyncSession,
+    vector: Sequence[float],
+    k: int = 10,
+    status: Optional[JobStatus] = None,
+    exclude_job_id: Optional[int] = None,
+) -> List[Tuple[Job, float]]:
+    """Nearest stored jobs by cosine distance, served by the HNSW index. Returns (job, similarity) pairs."""
+    distance = Job.embedding.cosine_distance(vector)
+    query = select(Job, distance.label("distance")).where(Job.embedding.is_not(None))
+    if status is not None:
+        query = query.where(Job.status == status)
+    if exclude_job_id is not None:
+        query = query.where(Job.id != exclude_job_id)
+    result = await session.execute(query.order_by(distance).limit(k))
+    return [(job, 1.0 - dist) for job, dist in result.all()]
+
+class JobRanker:
+    """
+    Embedding stage: embeds jobs and scores them by cosine similarity to the user profile.
+
+    The description fetch stage scores each job before it is enqueued (score_job_data), so
+    raw_job_priority orders raw_job_queue by similarity and the most similar jobs reach analyze_fit
+    first; MIN_PROFILE_SIMILARITY optionally rejects weak matches outright. The worker embeds again
+    when it stores the job, to keep the vector for top_k_similar and the pgvector HNSW index.
+    """
+    def __init__(self, embedder: Optional[Embedder] = None):
+        self.embedder = embedder or get_embedder()
+        self._profile_vectors: Dict[str, List[float]] = {}
+
+    async def profile_vector(self, profile: UserProfile) -> List[float]:
+        key = hashlib.sha256(profile.prompt_json.encode()).hexdigest()
+        if key not in self._profile_vectors:
+            [self._profile_vectors[key]] = await self.embedder.embed([profile_text(profile)])
+        return self._profile_vectors[key]
+
+    async def embed_jobs(self, jobs: List[Job], profile: UserProfile) -> List[Job]:
+        """Set `embedding` and `similarity_score` on each job (one embedder call for the batch)."""
+        if not jobs:
+            return jobs
+        target = await self.profile_vector(profile)
+        vectors = await self.embedder.embed([job_text(job) for job in jobs])
+        for job, vector in zip(jobs, vectors):
+            job.embedding = vector
+            job.similarity_score = cosine_similarity(vector, target)
+        return jobs
+
+    async def score_job_data(self, jobs: List[dict], profile: UserProfile) -> List[dict]:
+        """Set `similarity_score` on each queued job_data dict (one embedder call for the batch)."""
+        if not jobs:
+            return jobs
+        target = await self.profile_vector(profile)
+        vectors = await self.embedder.embed([job_data_text(job_data) for job_data in jobs])
+        for job_data, vector in zip(jobs, vectors):
+            job_data["similarity_score"] = round(cosine_similarity(vector, target), 4)
+        return jobs
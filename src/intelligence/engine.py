@@ -1,60 +1,281 @@
+import asyncio
+import logging
 import os
-from typing import Optional
-from langchain_openai import ChatOpenAI
-from langchain_anthropic import ChatAnthropic
-from langchain_core.language_models import BaseChatModel
-from src.intelligence.models import FitAnalysis, TailoredContent, JobRequirements, UserProfile
-from src.intelligence.prompts import FIT_ANALYSIS_PROMPT, TAILORING_PROMPT
+import time
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, List, Optional, Union
+from src.intelligence.cache import LLMCache
+from src.intelligence.models import FitAnalysis, FitAnalysisBatch, TailoredContent, JobRequirements, UserProfile
+from src.intelligence.ratelimit import LLMRateLimiter, estimate_tokens
+from src.intelligence.prompts import (
+    BATCH_FIT_ANALYSIS_PROMPT,
+    FIT_ANALYSIS_PROMPT,
+    FIT_ANALYSIS_PROMPT_VERSION,
+    TAILORING_PROMPT,
+    TAILORING_PROMPT_VERSION,
+)
+
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langchain_core.runnables import Runnable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODELS = {
+    "anthropic": "claude-3-5-sonnet-20240620",
+    "openai": "gpt-4o",
+}
+
+# Small, fast models tried first when the fit analysis cascade is enabled
+CASCADE_MODELS = {
+    "anthropic": "claude-3-haiku-20240307",
+    "openai": "gpt-4o-mini",
+}
+
+# ApplicationWorkflow applies when the fit score is above this
+FIT_THRESHOLD = 60
+
+# analyze_fit_batch modes: one concurrent call per job, or one multi-job prompt
+FIT_BATCH_MODES = ("concurrent", "prompt")
+
+@dataclass
+class ModelTier:
+    name: str
+    model_name: str
+    llm: "BaseChatModel"
+    calls: int = 0
+    seconds: float = 0.0
 
 class IntelligenceEngine:
-    def __init__(self, model_provider: str = "openai"):
-        self.llm = self._get_llm(model_provider)
+    def __init__(
+        self,
+        model_provider: str = "openai",
+        cache: Optional[LLMCache] = None,
+        rate_limiter: Optional[LLMRateLimiter] = None,
+        cascade_band: Optional[int] = None,
+    ):
+        self.provider = model_provider if model_provider in DEFAULT_MODELS else "openai"
+        self.model_name = DEFAULT_MODELS[self.provider]
+        self.rate_limiter = rate_limiter
+        self.llm = self._get_llm(self.provider, self.model_name)
+        self.cache = cache
+        self.large = ModelTier("large", self.model_name, self.llm)
+        # With a cascade band, analyze_fit runs the small model first and only re-runs on the
+        # large one when the score lands within `cascade_band` points of FIT_THRESHOLD
+        self.cascade_band = cascade_band
+        self.small = None
+        if cascade_band is not None:
+            small_model = CASCADE_MODELS[self.provider]
+            self.small = ModelTier("small", small_model, self._get_llm(self.provider, small_model))
+        self.escalations = 0
+        # Counted per job: one multi-job prompt on the small model can decide many jobs
+        self.decided_by_small = 0
 
-    def _get_llm(self, provider: str) -> BaseChatModel:
+    def _get_llm(self, provider: str, model: str) -> "BaseChatModel":
+        # Provider SDKs are imported on first use; each one costs a second or more at startup
         if provider == "anthropic":
+            from langchain_anthropic import ChatAnthropic
+
             api_key = os.getenv("ANTHROPIC_API_KEY")
             if not api_key:
                 raise ValueError("ANTHROPIC_API_KEY not found")
-            return ChatAnthropic(model="claude-3-5-sonnet-20240620", api_key=api_key)
+            return ChatAnthropic(model=model, api_key=api_key, **self._client_options())
         else:
+            from langchain_openai import ChatOpenAI
+
             api_key = os.getenv("OPENAI_API_KEY")
             if not api_key:
                 raise ValueError("OPENAI_API_KEY not found")
-            return ChatOpenAI(model="gpt-4o", api_key=api_key)
+            return ChatOpenAI(model=model, api_key=api_key, **self._client_options())
 
-    async def analyze_fit(self, job_description: str, user_profile: UserProfile) -> FitAnalysis:
-        structured_llm = self.llm.with_structured_output(FitAnalysis)
-        chain = FIT_ANALYSIS_PROMPT | structured_llm
-        
-        result = await chain.ainvoke({
+    def _client_options(self) -> dict:
+        # With a shared limiter, 429s are retried there with coordinated backoff, not blindly per client
+        return {"max_retries": 0} if self.rate_limiter else {}
+
+    async def ainvoke(self, runnable: "Runnable", inputs: Any, model_name: Optional[str] = None) -> Any:
+        """Invoke a chain or model built on one of this engine's llms, within the shared rate limit if one is set."""
+        if not self.rate_limiter:
+            return await runnable.ainvoke(inputs)
+        model_name = model_name or self.model_name
+        return await self.rate_limiter.run(
+            self.provider, model_name, lambda: runnable.ainvoke(inputs), estimate_tokens(inputs, model_name)
+        )
+
+    @property
+    def fit_model_key(self) -> str:
+        """Identifies what produced a fit analysis, so cascaded and single-model results aren't mixed in the cache."""
+        if self.small:
+            return f"{self.small.model_name}>{self.model_name}@{self.cascade_band}"
+        return self.model_name
+
+    def _fit_cache_key(self, job_description: str, profile_json: str) -> str:
+        return LLMCache.make_key(
+            "fit", FIT_ANALYSIS_PROMPT_VERSION, self.fit_model_key,
+            LLMCache.normalize_text(job_description), profile_json
+        )
+
+    async def _run_tier(self, tier: ModelTier, chain: "Runnable", inputs: dict) -> Any:
+        start = time.monotonic()
+        try:
+            return await self.ainvoke(chain, inputs, tier.model_name)
+        finally:
+            tier.calls += 1
+            tier.seconds += time.monotonic() - start
+
+    async def _fit_on(self, tier: ModelTier, job_description: str, profile_json: str) -> FitAnalysis:
+        chain = FIT_ANALYSIS_PROMPT | tier.llm.with_structured_output(FitAnalysis)
+        return await self._run_tier(tier, chain, {
             "job_description": job_description,
-            "user_profile": user_profile.model_dump_json()
+            "user_profile": profile_json
         })
+
+    def _is_borderline(self, analysis: FitAnalysis) -> bool:
+        return abs(analysis.score - FIT_THRESHOLD) <= self.cascade_band
+
+    async def _score_fit(self, job_description: str, profile_json: str) -> FitAnalysis:
+        if not self.small:
+            return await self._fit_on(self.large, job_description, profile_json)
+
+        try:
+            analysis = await self._fit_on(self.small, job_description, profile_json)
+            if not self._is_borderline(analysis):
+                self.decided_by_small += 1
+                return analysis
+        except Exception as e:
+            logger.warning(f"Small model fit analysis failed, escalating: {e}")
+        self.escalations += 1
+        return await self._fit_on(self.large, job_description, profile_json)
+
+    async def analyze_fit(self, job_description: str, user_profile: UserProfile) -> FitAnalysis:
+        profile_json = user_profile.prompt_json
+        cache_key = None
+        if self.cache:
+            cache_key = self._fit_cache_key(job_description, profile_json)
+            cached = await self.cache.get(cache_key, FitAnalysis)
+            if cached:
+                return cached
+
+        result = await self._score_fit(job_description, profile_json)
+
+        if cache_key:
+            await self.cache.set(cache_key, result)
         return result
 
-    async def extract_requirements(self, job_description: str) -> JobRequirements:
-        # We can combine this with analyze_fit or keep separate. 
-        # For cost efficiency, maybe separate or one large prompt.
-        # Let's keep separate for clarity or use a combined model if needed.
-        # For now, I'll use a separate call or specific prompt if needed.
-        # Actually, let's just use with_structured_output on a simple extraction prompt if needed,
-        # but FitAnalysis covers matching/missing skills which is usually enough for decision.
-        # If we need structured "JobRequirements" db storage, we can add a method.
-        
-        structured_llm = self.llm.with_structured_output(JobRequirements)
-        prompt = FIT_ANALYSIS_PROMPT # Re-using similar context but asking for requirements
-        # Ideally we have a dedicated prompt. Let's make a quick dynamic one or just assume FitAnalysis is enough for flow 1.
-        # But the architecture asked for "Extraction".
-        # Let's add a simple extraction method.
-        pass
+    async def analyze_fit_batch(
+        self, job_descriptions: List[str], user_profile: UserProfile, mode: str = "concurrent"
+    ) -> List[Union[FitAnalysis, Exception]]:
+        """
+        Fit analysis for several jobs against one profile. Each slot in the returned list holds
+        either that job's FitAnalysis or the exception it raised; one failure never fails the batch.
+
+        mode="concurrent" runs the per-job analyze_fit calls (cascade included) concurrently; it saves
+        wall time, not tokens.
+        mode="prompt" puts all jobs in a single multi-job prompt so the profile and instructions are
+        paid for once; jobs missing from the model's answer are retried individually.
+        With a cascade, the first pass uses the small model and borderline jobs are re-run on the large one.
+        """
+        if mode not in FIT_BATCH_MODES:
+            raise ValueError(f"Unknown fit batch mode '{mode}', expected one of {', '.join(FIT_BATCH_MODES)}")
+        profile_json = user_profile.prompt_json
+        results: List[Union[FitAnalysis, Exception, None]] = [None] * len(job_descriptions)
+
+        cache_keys: List[Optional[str]] = [None] * len(job_descriptions)
+        if self.cache:
+            for i, description in enumerate(job_descriptions):
+                cache_keys[i] = self._fit_cache_key(description, profile_json)
+                results[i] = await self.cache.get(cache_keys[i], FitAnalysis)
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending and mode == "prompt":
+            analyses = await self._analyze_fit_multi(
+                [job_descriptions[i] for i in pending], profile_json, self.small or self.large
+            )
+            escalate = []
+            for i, analysis in zip(pending, analyses):
+                if analysis is not None and self.small and self._is_borderline(analysis):
+                    escalate.append(i)
+                else:
+                    results[i] = analysis
+                    if analysis is not None and self.small:
+                        self.decided_by_small += 1
+
+            if escalate:
+                self.escalations += len(escalate)
+                outputs = await asyncio.gather(
+                    *(self._fit_on(self.large, job_descriptions[i], profile_json) for i in escalate),
+                    return_exceptions=True
+                )
+                for i, output in zip(escalate, outputs):
+                    results[i] = output
+            pending = [i for i in pending if results[i] is None]
+
+        if pending:
+            outputs = await asyncio.gather(
+                *(self._score_fit(job_descriptions[i], profile_json) for i in pending),
+                return_exceptions=True
+            )
+            for i, output in zip(pending, outputs):
+                results[i] = output
+
+        for i, result in enumerate(results):
+            if cache_keys[i] and isinstance(result, FitAnalysis):
+                await self.cache.set(cache_keys[i], result)
+        return results
+
+    async def _analyze_fit_multi(self, job_descriptions: List[str], profile_json: str, tier: ModelTier) -> List[Optional[FitAnalysis]]:
+        """Single multi-job call. Returns None for any job the model skipped or the call failed on."""
+        jobs_block = "\n\n".join(
+            f"--- JOB {i} ---\n{description}" for i, description in enumerate(job_descriptions)
+        )
+        chain = BATCH_FIT_ANALYSIS_PROMPT | tier.llm.with_structured_output(FitAnalysisBatch)
+        try:
+            batch = await self._run_tier(tier, chain, {"jobs": jobs_block, "user_profile": profile_json, "job_count": len(job_descriptions)})
+        except Exception as e:
+            logger.warning(f"Multi-job fit analysis failed, falling back to per-job calls: {e}")
+            return [None] * len(job_descriptions)
+
+        by_index = {item.job_index: item for item in batch.results if 0 <= item.job_index < len(job_descriptions)}
+        return [
+            FitAnalysis(**by_index[i].model_dump(exclude={"job_index"})) if i in by_index else None
+            for i in range(len(job_descriptions))
+        ]
+
+    def stats(self) -> dict:
+        """Per-tier fit analysis calls and latency, plus how often the cascade escalated."""
+        stats = {}
+        for tier in (self.small, self.large):
+            if tier:
+                stats[tier.name] = {
+                    "model": tier.model_name,
+                    "calls": tier.calls,
+                    "avg_latency": tier.seconds / tier.calls if tier.calls else 0.0,
+                }
+        if self.small:
+            stats["escalations"] = self.escalations
+            stats["decided_by_small"] = self.decided_by_small
+        return stats
 
     async def tailor_application(self, job_description: str, job_requirements: list[str], user_profile: UserProfile) -> TailoredContent:
+        requirements_text = ", ".join(job_requirements)
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(
+                "tailor", TAILORING_PROMPT_VERSION, self.model_name,
+                LLMCache.normalize_text(job_description), requirements_text, user_profile.resume_raw_text
+            )
+            cached = await self.cache.get(cache_key, TailoredContent)
+            if cached:
+                return cached
+
         structured_llm = self.llm.with_structured_output(TailoredContent)
         chain = TAILORING_PROMPT | structured_llm
         
-        result = await chain.ainvoke({
+        result = await self.ainvoke(chain, {
             "job_description": job_description,
-            "job_requirements": ", ".join(job_requirements),
+            "job_requirements": requirements_text,
             "resume_text": user_profile.resume_raw_text
         })
+
+        if cache_key:
+            await self.cache.set(cache_key, result)
         return result
@@ -1,30 +1,86 @@
-from typing import TypedDict, Annotated
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional, TypedDict, Annotated
 import operator
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, END
-from src.intelligence.engine import IntelligenceEngine
-from src.intelligence.models import FitAnalysis, TailoredContent, UserProfile
-from src.database.models import Job
+from src.intelligence.batching import FitBatcher
+from src.intelligence.engine import FIT_THRESHOLD, IntelligenceEngine
+from src.intelligence.models import FitAnalysis, JobPosting, JobRequirements, PrefilterResult, TailoredContent, UserProfile
+from src.intelligence.prefilter import SkillPrefilter, requirements_coverage, split_requirements
+from src.intelligence.preprocess import DEFAULT_TOKEN_BUDGET, prepare_description
+
+logger = logging.getLogger(__name__)
+
+# Called with (node name, state update) as each node finishes
+OnUpdate = Callable[[str, dict], Awaitable[None]]
 
 class AgentState(TypedDict):
-    job: Job
+    job: JobPosting
     user_profile: UserProfile
+    prefilter: Annotated[PrefilterResult, "Deterministic Prefilter Result"]
     fit_analysis: Annotated[FitAnalysis, "Fit Analysis Result"]
+    requirements: Annotated[Optional[JobRequirements], "Stored or freshly extracted Job Requirements"]
     tailored_content: Annotated[TailoredContent, "Tailored Content"]
     decision: str
 
 class ApplicationWorkflow:
-    def __init__(self, engine: IntelligenceEngine):
+    def __init__(
+        self,
+        engine: IntelligenceEngine,
+        prefilter: Optional[SkillPrefilter] = None,
+        min_similarity: Optional[float] = None,
+        fit_batcher: Optional[FitBatcher] = None,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        speculative_min_prefilter_score: Optional[int] = None,
+        speculative_min_similarity: Optional[float] = None,
+        stored_reject_below: Optional[int] = None,
+        stored_apply_at: Optional[int] = None,
+        checkpointer: Optional[BaseCheckpointSaver] = None,
+    ):
         self.engine = engine
+        # Max tokens of (cleaned) description sent to the model
+        self.token_budget = token_budget
+        # When set, concurrent fit analyses are grouped into micro-batches
+        self.fit_batcher = fit_batcher
+        self.prefilter = prefilter or SkillPrefilter()
+        # When set, jobs embedded less similar to the profile than this never reach analyze_fit
+        self.min_similarity = min_similarity
+        # Jobs at or above either prior start tailoring alongside analyze_fit instead of after it
+        self.speculative_min_prefilter_score = speculative_min_prefilter_score
+        self.speculative_min_similarity = speculative_min_similarity
+        # Re-processed jobs with stored requirements skip analyze_fit when their required-skill
+        # coverage is below / at or above these; in between the model still decides
+        self.stored_reject_below = stored_reject_below
+        self.stored_apply_at = stored_apply_at
+        self.speculation = {"started": 0, "used": 0, "wasted": 0, "cancelled": 0, "failed": 0}
+        # Persists state after every node so a restarted worker resumes mid-graph (see ainvoke)
+        self.checkpointer = checkpointer
+        self.workflow = self._build_graph()
+
+    def use_checkpointer(self, checkpointer: BaseCheckpointSaver):
+        self.checkpointer = checkpointer
         self.workflow = self._build_graph()
 
     def _build_graph(self):
         workflow = StateGraph(AgentState)
 
+        workflow.add_node("prefilter", self.prefilter_node)
         workflow.add_node("analyze_fit", self.analyze_fit_node)
         workflow.add_node("tailor_content", self.tailor_content_node)
         workflow.add_node("archive_job", self.archive_job_node)
 
-        workflow.set_entry_point("analyze_fit")
+        workflow.set_entry_point("prefilter")
+
+        workflow.add_conditional_edges(
+            "prefilter",
+            self.should_analyze,
+            {
+                "analyze": "analyze_fit",
+                "apply": "tailor_content",
+                "reject": "archive_job"
+            }
+        )
 
         workflow.add_conditional_edges(
             "analyze_fit",
@@ -38,28 +94,214 @@ class ApplicationWorkflow:
         workflow.add_edge("tailor_content", END)
         workflow.add_edge("archive_job", END)
 
-        return workflow.compile()
+        return workflow.compile(checkpointer=self.checkpointer)
 
-    async def analyze_fit_node(self, state: AgentState):
+    async def ainvoke(
+        self, state: AgentState, thread_id: Optional[str] = None, on_update: Optional[OnUpdate] = None
+    ) -> AgentState:
+        """
+        Run the workflow. With a checkpointer, `thread_id` keys the job's saved state: a run that
+        was interrupted resumes after its last completed node, and a run that already finished
+        returns its saved result without calling the model again. `on_update` sees each node's
+        output as soon as it finishes, so callers can persist it before later nodes run.
+        """
+        if not self.checkpointer:
+            return await self._run(state, None, on_update)
+
+        config = {"configurable": {"thread_id": thread_id}}
+        snapshot = await self.workflow.aget_state(config)
+        if snapshot.next:
+            logger.info(f"Resuming workflow {thread_id} at {', '.join(snapshot.next)}")
+            return await self._run(None, config, on_update)
+        if snapshot.values:
+            logger.info(f"Workflow {thread_id} already finished; reusing its checkpointed result")
+            return snapshot.values
+        return await self._run(state, config, on_update)
+
+    async def _run(self, state: Optional[AgentState], config: Optional[dict], on_update: Optional[OnUpdate]) -> AgentState:
+        if on_update is None:
+            return await self.workflow.ainvoke(state, config)
+        result = None
+        async for mode, chunk in self.workflow.astream(state, config, stream_mode=["updates", "values"]):
+            if mode == "values":
+                result = chunk
+                continue
+            for node, update in chunk.items():
+                if update:
+                    await on_update(node, update)
+        return result
+
+    async def forget(self, thread_id: str):
+        """Drop a job's checkpoints once its outcome is committed."""
+        if self.checkpointer:
+            await self.checkpointer.adelete_thread(thread_id)
+
+    def _model_description(self, job: JobPosting) -> str:
+        """Cleaned, boilerplate-free description trimmed to the token budget."""
+        return prepare_description(job.description_text, job.description_html, self.token_budget, self.engine.model_name)
+
+    async def prefilter_node(self, state: AgentState):
         job = state["job"]
-        # Allow text or html, handle missing text logic elsewhere or assume populated
         description = job.description_text or job.description_html or ""
-        
-        analysis = await self.engine.analyze_fit(description, state["user_profile"])
-        
+        result = self.prefilter.evaluate(f"{job.title}\n{description}", state["user_profile"].skills)
+
+        requirements = state.get("requirements")
+        if requirements:
+            # Re-processed job: its extracted requirements are a better score than a keyword scan
+            result = result.model_copy(update={"score": requirements_coverage(requirements, state["user_profile"].skills)})
+
+        if (
+            result.passed
+            and self.min_similarity is not None
+            and job.similarity_score is not None
+            and job.similarity_score < self.min_similarity
+        ):
+            result = result.model_copy(update={
+                "passed": False,
+                "reason": f"Profile similarity {job.similarity_score:.2f} below {self.min_similarity:.2f}"
+            })
+
+        if result.passed and requirements and requirements.required_skills:
+            verdict = self._stored_verdict(result.score)
+            if verdict:
+                return self._decide_from_requirements(result, requirements, state["user_profile"], verdict)
+
+        if result.passed:
+            return {"prefilter": result}
+
+        # Record the rejection like an LLM verdict so fit_reasoning explains it
+        return {
+            "prefilter": result,
+            "fit_analysis": FitAnalysis(
+                score=result.score,
+                reasoning=f"Prefilter rejected: {result.reason}",
+                missing_critical_skills=result.missing_terms,
+                matching_skills=result.matched_skills,
+                decision="REJECT"
+            ),
+            "decision": "REJECT"
+        }
+
+    def _stored_verdict(self, coverage: int) -> Optional[str]:
+        if self.stored_reject_below is not None and coverage < self.stored_reject_below:
+            return "REJECT"
+        if self.stored_apply_at is not None and coverage >= self.stored_apply_at:
+            return "APPLY"
+        return None
+
+    def _decide_from_requirements(
+        self, result: PrefilterResult, requirements: JobRequirements, profile: UserProfile, verdict: str
+    ) -> dict:
+        """Verdict from the stored requirements alone, recorded like an LLM one; no fit analysis call."""
+        covered, missing = split_requirements(requirements, profile.skills)
+        reason = f"Stored requirements: profile covers {len(covered)} of {len(requirements.required_skills)} required skills"
+        if verdict == "REJECT":
+            result = result.model_copy(update={"passed": False, "reason": reason})
         return {
+            "prefilter": result,
+            "fit_analysis": FitAnalysis(
+                score=result.score,
+                reasoning=reason,
+                missing_critical_skills=missing,
+                matching_skills=covered,
+                decision=verdict,
+                requirements=requirements,
+            ),
+            "decision": verdict,
+        }
+
+    def _has_strong_prior(self, state: AgentState) -> bool:
+        job = state["job"]
+        prefilter = state.get("prefilter")
+        if self.speculative_min_prefilter_score is not None and prefilter and prefilter.score >= self.speculative_min_prefilter_score:
+            return True
+        return (
+            self.speculative_min_similarity is not None
+            and job.similarity_score is not None
+            and job.similarity_score >= self.speculative_min_similarity
+        )
+
+    async def analyze_fit_node(self, state: AgentState):
+        job = state["job"]
+        description = self._model_description(job)
+
+        stored = state.get("requirements")
+        speculative = None
+        if self._has_strong_prior(state):
+            if stored:
+                job_requirements = stored.required_skills + stored.preferred_skills
+            else:
+                # Requirements aren't extracted yet; the prefilter's matched skills stand in for them
+                job_requirements = state["prefilter"].matched_skills
+            speculative = asyncio.create_task(self.engine.tailor_application(
+                description, job_requirements, state["user_profile"]
+            ))
+            self.speculation["started"] += 1
+
+        try:
+            if self.fit_batcher:
+                analysis = await self.fit_batcher.submit(description, state["user_profile"])
+            else:
+                analysis = await self.engine.analyze_fit(description, state["user_profile"])
+        except BaseException:
+            if speculative:
+                await self._discard(speculative)
+            raise
+
+        decision = "APPLY" if analysis.score > FIT_THRESHOLD else "REJECT" # Simple threshold
+        update = {
             "fit_analysis": analysis,
-            "decision": "APPLY" if analysis.score > 60 else "REJECT" # Simple threshold
+            "requirements": analysis.requirements or stored,
+            "decision": decision
         }
+        if speculative is None:
+            return update
+        if decision != "APPLY":
+            await self._discard(speculative)
+            return update
+
+        try:
+            update["tailored_content"] = await speculative
+            self.speculation["used"] += 1
+        except Exception as e:
+            # tailor_content runs it again the normal way
+            self.speculation["failed"] += 1
+            logger.warning(f"Speculative tailoring failed for job {job.id}: {e}")
+        return update
+
+    async def _discard(self, task: asyncio.Task):
+        if task.done():
+            # Already paid for; only the result is thrown away
+            self.speculation["wasted"] += 1
+            if not task.cancelled():
+                task.exception()
+            return
+        task.cancel()
+        self.speculation["cancelled"] += 1
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
 
     async def tailor_content_node(self, state: AgentState):
+        if state.get("tailored_content"):
+            # Produced speculatively during analyze_fit
+            return {}
+
         job = state["job"]
         analysis = state["fit_analysis"]
-        description = job.description_text or ""
+        description = self._model_description(job)
         
+        requirements = state.get("requirements")
+        if requirements:
+            job_requirements = requirements.required_skills + requirements.preferred_skills
+        else:
+            # Model skipped extraction; matching skills are the closest proxy
+            job_requirements = analysis.matching_skills
+
         content = await self.engine.tailor_application(
             description, 
-            analysis.matching_skills, # Using matching skills as proxy for requirements context
+            job_requirements,
             state["user_profile"]
         )
         
@@ -69,5 +311,11 @@ class ApplicationWorkflow:
         # In a real app we would update DB status here or return a flag
         return {"decision": "REJECTED"}
 
+    def should_analyze(self, state: AgentState):
+        if not state["prefilter"].passed:
+            return "reject"
+        # Decided from stored requirements; straight to tailoring
+        return "apply" if state.get("decision") == "APPLY" else "analyze"
+
     def should_apply(self, state: AgentState):
         return "apply" if state["decision"] == "APPLY" else "reject"
@@ -1,7 +1,11 @@
+from functools import cached_property
 from typing import List, Optional
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 class JobRequirements(BaseModel):
+    # Also loaded back from JobRequirementsRecord rows
+    model_config = ConfigDict(from_attributes=True)
+
     required_skills: List[str] = Field(description="List of technical skills explicitly required")
     preferred_skills: List[str] = Field(description="List of nice-to-have skills")
     experience_level: str = Field(description="Junior, Senior, Staff, etc.")
@@ -15,12 +19,37 @@ class FitAnalysis(BaseModel):
     missing_critical_skills: List[str] = Field(description="Skills required but missing from User Profile")
     matching_skills: List[str] = Field(description="Skills present in both Job and User Profile")
     decision: str = Field(description="APPLY or REJECT")
+    # Extracted in the same call so tailoring and re-scoring don't need another pass over the description
+    requirements: Optional[JobRequirements] = Field(
+        default=None, description="Structured requirements extracted from the Job Description"
+    )
+
+class BatchedFitAnalysis(FitAnalysis):
+    job_index: int = Field(description="Index of the job this analysis belongs to, as numbered in the prompt")
+
+class FitAnalysisBatch(BaseModel):
+    results: List[BatchedFitAnalysis] = Field(description="One analysis per job, in any order")
 
 class TailoredContent(BaseModel):
     resume_bullet_points: List[str] = Field(description="Tailored bullet points for the resume")
     cover_letter: str = Field(description="Full text of the tailored cover letter")
 
+class JobPosting(BaseModel):
+    """The parts of a Job row the workflow reads. Plain data, so graph state can be checkpointed."""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    company: Optional[str] = None
+    url: Optional[str] = None
+    description_text: Optional[str] = None
+    description_html: Optional[str] = None
+    similarity_score: Optional[float] = None
+
 class UserProfile(BaseModel):
+    # Immutable, so each instance is one profile version and its prompt serialization can be cached
+    model_config = ConfigDict(frozen=True)
+
     full_name: str
     email: str
     phone: str
@@ -31,3 +60,15 @@ class UserProfile(BaseModel):
     resume_raw_text: str
     requires_sponsorship: bool = False
 
+    @cached_property
+    def prompt_json(self) -> str:
+        """JSON sent to the model (and hashed into cache keys), serialized once per profile version."""
+        return self.model_dump_json()
+
+
+class PrefilterResult(BaseModel):
+    passed: bool
+    score: int = Field(description="Share of profile skills found in the description, 0-100")
+    matched_skills: List[str] = Field(default_factory=list)
+    missing_terms: List[str] = Field(default_factory=list, description="Must-have terms not found")
+    reason: str = ""
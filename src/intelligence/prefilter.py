@@ -0,0 +1,105 @@
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Pattern, Tuple
+from src.intelligence.models import JobRequirements, PrefilterResult
+
+def _compile_terms(terms: Tuple[str, ...]) -> Optional[Pattern]:
+    """One alternation for all terms. Boundaries allow symbols inside terms such as C++, C# or Node.js."""
+    if not terms:
+        return None
+    alternatives = sorted((re.escape(term.lower()) for term in terms), key=len, reverse=True)
+    return re.compile(r"(?<![\w+#])(?:" + "|".join(alternatives) + r")(?![\w+#])", re.IGNORECASE)
+
+@lru_cache(maxsize=32)
+def _compiled(terms: Tuple[str, ...]) -> Tuple[Optional[Pattern], Dict[str, str]]:
+    return _compile_terms(terms), {term.lower(): term for term in terms}
+
+def _find(terms: Tuple[str, ...], text: str) -> List[str]:
+    pattern, canonical = _compiled(terms)
+    if not pattern:
+        return []
+    return sorted({canonical[match.lower()] for match in pattern.findall(text) if match.lower() in canonical})
+
+def _env_terms(name: str) -> List[str]:
+    return [term.strip() for term in os.getenv(name, "").split(",") if term.strip()]
+
+class SkillPrefilter:
+    """
+    Deterministic pre-LLM screen. Matches profile skills and must-have / must-not-have terms
+    against the description with precompiled patterns and rejects clear misses.
+
+    Descriptions shorter than `min_description_chars` (e.g. title-only jobs) carry too little
+    signal for skill or must-have checks, so only must-not-have terms are applied to them.
+    """
+    def __init__(
+        self,
+        must_have: Iterable[str] = (),
+        must_not_have: Iterable[str] = (),
+        min_skill_matches: int = 1,
+        min_description_chars: int = 300,
+    ):
+        self.must_have = tuple(must_have)
+        self.must_not_have = tuple(must_not_have)
+        self.min_skill_matches = min_skill_matches
+        self.min_description_chars = min_description_chars
+
+    @classmethod
+    def from_env(cls) -> "SkillPrefilter":
+        return cls(
+            must_have=_env_terms("PREFILTER_MUST_HAVE"),
+            must_not_have=_env_terms("PREFILTER_MUST_NOT_HAVE"),
+            min_skill_matches=int(os.getenv("PREFILTER_MIN_SKILL_MATCHES", 1)),
+            min_description_chars=int(os.getenv("PREFILTER_MIN_DESCRIPTION_CHARS", 300)),
+        )
+
+    def evaluate(self, text: str, skills: Iterable[str]) -> PrefilterResult:
+        text = text or ""
+        skills = tuple(skills)
+        matched = _find(skills, text)
+        score = round(100 * len(matched) / len(skills)) if skills else 0
+
+        excluded = _find(self.must_not_have, text)
+        if excluded:
+            return PrefilterResult(
+                passed=False, score=score, matched_skills=matched,
+                reason=f"Mentions excluded terms: {', '.join(excluded)}"
+            )
+
+        if len(text) < self.min_description_chars:
+            return PrefilterResult(passed=True, score=score, matched_skills=matched, reason="Description too short to screen")
+
+        found_required = set(_find(self.must_have, text))
+        missing = [term for term in self.must_have if term not in found_required]
+        if missing:
+            return PrefilterResult(
+                passed=False, score=score, matched_skills=matched, missing_terms=missing,
+                reason=f"Missing required terms: {', '.join(missing)}"
+            )
+
+        if len(matched) < self.min_skill_matches:
+            return PrefilterResult(
+                passed=False, score=score, matched_skills=matched,
+                reason=f"Matched {len(matched)} of {len(skills)} profile skills (need {self.min_skill_matches})"
+            )
+
+        return PrefilterResult(passed=True, score=score, matched_skills=matched, reason=f"Matched skills: {', '.join(matched)}")
+
+def requirements_coverage(requirements: JobRequirements, skills: Iterable[str]) -> int:
+    """
+    Re-score a job from its stored requirements without another LLM pass: the share (0-100) of
+    required skills covered by the profile, using the same boundary-aware matching as the prefilter.
+    """
+    required = requirements.required_skills
+    if not required:
+        return 100
+    covered, _ = split_requirements(requirements, skills)
+    return round(100 * len(covered) / len(required))
+
+def split_requirements(requirements: JobRequirements, skills: Iterable[str]) -> Tuple[List[str], List[str]]:
+    """Required skills the profile covers, and the ones it doesn't."""
+    skills = tuple(skills)
+    covered, missing = [], []
+    for item in requirements.required_skills:
+        (covered if _find(skills, item) else missing).append(item)
+    return covered, missing
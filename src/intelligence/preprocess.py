@@ -0,0 +1,132 @@
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+from bs4 import BeautifulSoup
+
+logger = logging.getLogger(__name__)
+
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:
+    HTML_PARSER = "html.parser"
+
+DEFAULT_TOKEN_BUDGET = 1500
+
+# Section headings whose body is boilerplate up to the next heading
+BOILERPLATE_HEADING = re.compile(
+    # "About <company>" is boilerplate; "About you" / "About the candidate" are the requirements
+    r"^(about (?!(the|this) (role|job|position|opportunity|team)\b|(you|your|the (ideal )?candidate)\b)"
+    r"[\w&.\- ]{1,40}|who we are|our (mission|story|values)|"
+    r"benefits|perks( (and|&) benefits)?|what we offer|why (join us|work here)|compensation( (and|&) benefits)?|"
+    r"equal (employment )?opportunity|eeo statement|diversity( (and|&) inclusion)?)\b",
+    re.IGNORECASE,
+)
+
+# Headings that start job content again after a boilerplate section
+CONTENT_HEADING = re.compile(
+    r"^(about (the|this) (role|job|position|opportunity|team)|about (you|your|the (ideal )?candidate)|"
+    r"(the |your )?role|responsibilities|requirements|"
+    r"qualifications|what you('ll| will) (do|bring|need)|who you are|skills|experience|nice to have|"
+    r"(preferred|minimum|basic) qualifications|tech(nology)? stack|the job|position|job description|overview)\b",
+    re.IGNORECASE,
+)
+
+# Individual boilerplate sentences that also show up outside their own section
+BOILERPLATE_LINE = re.compile(
+    r"equal opportunity employer|without regard to (race|age|sex)|protected veteran|reasonable accommodation|"
+    r"e-verify|affirmative action|401\(k\)|paid time off|health, dental|dental,? (and )?vision|"
+    r"pay transparency|applicants? (with|requiring) (a )?disabilit",
+    re.IGNORECASE,
+)
+
+def looks_like_html(text: str) -> bool:
+    return bool(re.search(r"<(p|div|br|li|ul|span|strong|h\d)\b", text or "", re.IGNORECASE))
+
+def html_to_text(html: str) -> str:
+    """Flatten posting HTML to text, one block per line. Uses lxml when installed."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for tag in soup(["script", "style", "noscript"]):
+        tag.decompose()
+    lines = (re.sub(r"\s+", " ", line).strip() for line in soup.get_text("\n").splitlines())
+    return "\n".join(line for line in lines if line)
+
+def _is_heading(line: str) -> bool:
+    if len(line.split()) > 6 or line.endswith("."):
+        return False
+    title = line.rstrip(":")
+    return line.endswith(":") or bool(BOILERPLATE_HEADING.match(title) or CONTENT_HEADING.match(title))
+
+def strip_boilerplate(text: str) -> str:
+    """Drop EEO statements, benefits blurbs, company "about us" sections and repeated paragraphs."""
+    kept: List[str] = []
+    seen = set()
+    in_boilerplate = False
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+
+        if _is_heading(line):
+            in_boilerplate = bool(BOILERPLATE_HEADING.match(line.rstrip(":")))
+            if in_boilerplate:
+                continue
+        elif in_boilerplate or BOILERPLATE_LINE.search(line):
+            continue
+
+        key = line.lower()
+        if key in seen:
+            continue
+        seen.add(key)
+        kept.append(line)
+
+    return "\n".join(kept)
+
+# Rough chars-per-token ratio, used only when no tokenizer can be loaded
+CHARS_PER_TOKEN = 4
+
+@lru_cache(maxsize=8)
+def _encoding(model_name: str):
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model_name)
+        except KeyError:
+            # Non-OpenAI models: cl100k is a close enough proxy for budgeting
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        # tiktoken missing, or its BPE files can't be downloaded
+        logger.warning(f"Tokenizer unavailable ({e}); approximating {CHARS_PER_TOKEN} chars per token")
+        return None
+
+def count_tokens(text: str, model_name: str = "gpt-4o") -> int:
+    encoding = _encoding(model_name)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text))
+
+def truncate_to_tokens(text: str, budget: int, model_name: str = "gpt-4o") -> str:
+    encoding = _encoding(model_name)
+    if encoding is None:
+        return text[:budget * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text)
+    if len(tokens) <= budget:
+        return text
+    return encoding.decode(tokens[:budget])
+
+def prepare_description(
+    description_text: Optional[str],
+    description_html: Optional[str] = None,
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    model_name: str = "gpt-4o",
+) -> str:
+    """Turn a stored posting into the text sent to the model: plain text, no boilerplate, within budget."""
+    text = description_text or ""
+    if (not text and description_html) or looks_like_html(text):
+        text = html_to_text(text or description_html)
+
+    text = strip_boilerplate(text)
+    return truncate_to_tokens(text, token_budget, model_name)
@@ -0,0 +1,15 @@
+from src.intelligence.models import UserProfile
+
+def load_user_profile() -> UserProfile:
+    """The applicant's profile, shared by every stage that scores jobs against it."""
+    # Mock User Profile for V1 - typically loaded from DB
+    return UserProfile(
+        full_name="Margulan Baizhakyp",
+        email="margulan@example.com",
+        phone="+1-555-0199",
+        linkedin_url="linkedin.com/in/margulan",
+        github_url="github.com/margulan",
+        skills=["Python", "FastAPI", "React", "AWS", "Docker"],
+        experience_summary="Senior Software Engineer with 5 years of experience...",
+        resume_raw_text="Experienced in building scalable web applications..."
+    )
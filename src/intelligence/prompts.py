@@ -1,5 +1,9 @@
 from langchain_core.prompts import ChatPromptTemplate
 
+# Bump when a prompt template changes so cached results from the old template are not reused
+FIT_ANALYSIS_PROMPT_VERSION = "2"
+TAILORING_PROMPT_VERSION = "1"
+
 FIT_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(
     """You are an expert Career Coach and Technical Recruiter.
     
@@ -16,8 +20,31 @@ FIT_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(
     - Score > 60: Potential Match (Apply if few applicants)
     - Score < 60: Poor Match (Reject)
     
-    Also extract the specific technical requirements and sponsorship availability.
+    Also extract the specific technical requirements and sponsorship availability into the requirements field.
+    
+    Return the output in the specified JSON format.
+    """
+)
+
+BATCH_FIT_ANALYSIS_PROMPT = ChatPromptTemplate.from_template(
+    """You are an expert Career Coach and Technical Recruiter.
+    
+    Evaluate each of the following {job_count} Job Descriptions independently against the Candidate Profile.
+    
+    CANDIDATE PROFILE:
+    {user_profile}
+    
+    JOB DESCRIPTIONS:
+    {jobs}
+    
+    For every job, determine a Fit Score (0-100) and decide if we should APPLY or REJECT.
+    - Score > 80: Strong Match (Apply)
+    - Score > 60: Potential Match (Apply if few applicants)
+    - Score < 60: Poor Match (Reject)
+    
+    Also extract each job's specific technical requirements and sponsorship availability into its requirements field.
     
+    Return exactly one result per job, with job_index set to the job's number.
     Return the output in the specified JSON format.
     """
 )
@@ -0,0 +1,244 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+from redis.asyncio import Redis
+from src.intelligence.preprocess import count_tokens
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Rough cost of an image part in a multimodal message (a low-detail screenshot)
+IMAGE_TOKENS = 1000
+# Prompt template text and structured-output schema that aren't part of the inputs
+PROMPT_OVERHEAD_TOKENS = 300
+
+# Two token buckets (requests, tokens) per provider/model, refilled at `limit * scale` per minute.
+# Uses the Redis clock so every process agrees on time. Returns the seconds to wait, "0" when granted.
+ACQUIRE_SCRIPT = """
+local key = KEYS[1]
+local rpm = tonumber(ARGV[1])
+local tpm = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local burst = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local s = redis.call('HMGET', key, 'req', 'tok', 'ts', 'scale', 'cooldown_until')
+local scale = tonumber(s[4]) or 1
+local cooldown_until = tonumber(s[5]) or 0
+if now < cooldown_until then
+    return tostring(cooldown_until - now)
+end
+
+local elapsed = math.max(0, now - (tonumber(s[3]) or now))
+local req_rate = rpm * scale / 60
+local tok_rate = tpm * scale / 60
+local req_cap = math.max(1, req_rate * burst)
+local tok_cap = math.max(1, tok_rate * burst)
+cost = math.min(cost, tok_cap)
+local req = math.min(req_cap, (tonumber(s[1]) or req_cap) + elapsed * req_rate)
+local tok = math.min(tok_cap, (tonumber(s[2]) or tok_cap) + elapsed * tok_rate)
+
+local wait = 0
+if rpm > 0 and req < 1 then
+    wait = math.max(wait, (1 - req) / req_rate)
+end
+if tpm > 0 and tok < cost then
+    wait = math.max(wait, (cost - tok) / tok_rate)
+end
+if wait == 0 then
+    req = req - 1
+    tok = tok - cost
+end
+
+redis.call('HSET', key, 'req', req, 'tok', tok, 'ts', now)
+redis.call('EXPIRE', key, 3600)
+return tostring(wait)
+"""
+
+# Multiplicative decrease on a 429, at most once per `hold` seconds so a burst of 429s from
+# several processes counts as one congestion event. Also pauses everyone for `retry_after`.
+PENALIZE_SCRIPT = """
+local key = KEYS[1]
+local factor = tonumber(ARGV[1])
+local min_scale = tonumber(ARGV[2])
+local retry_after = tonumber(ARGV[3])
+local hold = tonumber(ARGV[4])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+
+local s = redis.call('HMGET', key, 'scale', 'decreased_at', 'cooldown_until')
+local scale = tonumber(s[1]) or 1
+if now - (tonumber(s[2]) or 0) >= hold then
+    scale = math.max(min_scale, scale * factor)
+    redis.call('HSET', key, 'scale', scale, 'decreased_at', now)
+end
+redis.call('HSET', key, 'cooldown_until', math.max(tonumber(s[3]) or 0, now + retry_after))
+redis.call('EXPIRE', key, 3600)
+return tostring(scale)
+"""
+
+# Additive increase after each successful call, capped at the configured limit
+RECOVER_SCRIPT = """
+local key = KEYS[1]
+local step = tonumber(ARGV[1])
+local scale = tonumber(redis.call('HGET', key, 'scale') or '1')
+if scale < 1 then
+    redis.call('HSET', key, 'scale', math.min(1, scale + step))
+end
+return 0
+"""
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Provider SDK errors (openai / anthropic RateLimitError) carry status_code 429."""
+    return getattr(error, "status_code", None) == 429 or type(error).__name__ == "RateLimitError"
+
+def _retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+def estimate_tokens(inputs: Any, model_name: str = "gpt-4o") -> int:
+    """Prompt tokens for chain inputs (dict of strings) or a list of chat messages."""
+    if isinstance(inputs, str):
+        return count_tokens(inputs, model_name)
+    if isinstance(inputs, dict):
+        if inputs.get("type") == "image_url":
+            return IMAGE_TOKENS
+        return sum(estimate_tokens(value, model_name) for value in inputs.values())
+    if isinstance(inputs, (list, tuple)):
+        return sum(estimate_tokens(item, model_name) for item in inputs)
+    if hasattr(inputs, "content"):
+        return estimate_tokens(inputs.content, model_name)
+    return 0
+
+class LLMRateLimiter:
+    """
+    Requests-per-minute and tokens-per-minute budgets per provider and model, shared by every
+    process through Redis. Provider 429s shrink the shared rate (AIMD: halve on a rate-limit
+    error, creep back up on success), so throughput settles just under the real provider limit
+    instead of every worker retrying into the same wall.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        rpm: int = 0,
+        tpm: int = 0,
+        overrides: Optional[Dict[str, Dict[str, int]]] = None,
+        completion_tokens: int = 800,
+        burst_seconds: float = 10.0,
+        max_retries: int = 5,
+        key_prefix: str = "llm_rate",
+    ):
+        self.redis = redis
+        self.rpm = rpm
+        self.tpm = tpm
+        self.overrides = overrides or {}
+        self.completion_tokens = completion_tokens
+        self.burst_seconds = burst_seconds
+        self.max_retries = max_retries
+        self.key_prefix = key_prefix
+        self.decrease_factor = 0.5
+        self.min_scale = 0.05
+        self.increase_step = 0.02
+        self.hold_seconds = 5.0
+        self._acquire = redis.register_script(ACQUIRE_SCRIPT)
+        self._penalize = redis.register_script(PENALIZE_SCRIPT)
+        self._recover = redis.register_script(RECOVER_SCRIPT)
+        self.calls = 0
+        self.throttled = 0
+        self.wait_seconds = 0.0
+        self.rate_limited = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["LLMRateLimiter"]:
+        """
+        Opt-in: LLM_RPM_LIMIT / LLM_TPM_LIMIT set the default budget (0, the default, leaves that
+        bucket unlimited), LLM_RATE_LIMITS overrides it per model, e.g.
+        {"gpt-4o-mini": {"rpm": 5000, "tpm": 2000000}}. With none of them set, or with
+        LLM_RATE_LIMITER=none, there is no limiter and calls go straight to the provider.
+        """
+        rpm = int(os.getenv("LLM_RPM_LIMIT", 0))
+        tpm = int(os.getenv("LLM_TPM_LIMIT", 0))
+        overrides = json.loads(os.getenv("LLM_RATE_LIMITS", "{}"))
+        if os.getenv("LLM_RATE_LIMITER", "redis") == "none" or not (rpm > 0 or tpm > 0 or overrides):
+            return None
+        redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+        return cls(
+            redis,
+            rpm=rpm,
+            tpm=tpm,
+            overrides=overrides,
+            completion_tokens=int(os.getenv("LLM_COMPLETION_TOKEN_ESTIMATE", 800)),
+            max_retries=int(os.getenv("LLM_RATE_LIMIT_RETRIES", 5)),
+        )
+
+    def limits_for(self, model: str) -> Tuple[int, int]:
+        override = self.overrides.get(model, {})
+        return override.get("rpm", self.rpm), override.get("tpm", self.tpm)
+
+    def _key(self, provider: str, model: str) -> str:
+        return f"{self.key_prefix}:{provider}:{model}"
+
+    async def acquire(self, provider: str, model: str, tokens: int):
+        """Wait until the shared budget for this model admits one request of `tokens` tokens."""
+        rpm, tpm = self.limits_for(model)
+        if rpm <= 0 and tpm <= 0:
+            return
+
+        key = self._key(provider, model)
+        waited = 0.0
+        while True:
+            wait = float(await self._acquire(keys=[key], args=[rpm, tpm, tokens, self.burst_seconds]))
+            if wait <= 0:
+                break
+            # Jitter so waiting processes don't all retry on the same tick
+            wait = min(wait, 60.0) * random.uniform(1.0, 1.2)
+            waited += wait
+            await asyncio.sleep(wait)
+
+        self.calls += 1
+        if waited:
+            self.throttled += 1
+            self.wait_seconds += waited
+
+    async def run(self, provider: str, model: str, call: Callable[[], Awaitable[T]], tokens: int) -> T:
+        """Run `call` within the budget, retrying provider rate-limit errors with shared backoff."""
+        tokens += self.completion_tokens + PROMPT_OVERHEAD_TOKENS
+        key = self._key(provider, model)
+        for attempt in range(self.max_retries + 1):
+            await self.acquire(provider, model, tokens)
+            try:
+                result = await call()
+            except Exception as e:
+                if not is_rate_limit_error(e) or attempt == self.max_retries:
+                    raise
+                self.rate_limited += 1
+                retry_after = _retry_after(e) or min(2 ** attempt, 30)
+                scale = float(await self._penalize(
+                    keys=[key], args=[self.decrease_factor, self.min_scale, retry_after, self.hold_seconds]
+                ))
+                logger.warning(f"Rate limited by {provider}/{model}; pausing {retry_after:.1f}s at {scale:.0%} of the configured budget")
+                continue
+
+            await self._recover(keys=[key], args=[self.increase_step])
+            return result
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "throttled": self.throttled,
+            "wait_seconds": round(self.wait_seconds, 1),
+            "rate_limited": self.rate_limited,
+        }
+
+    async def close(self):
+        await self.redis.aclose()
@@ -2,6 +2,8 @@ import asyncio
 import json
 import logging
 import os
+import signal
+from typing import Optional
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -10,81 +12,218 @@ load_dotenv()
 from redis.asyncio import Redis
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 from src.analytics.logger import log_event
 from src.database.config import async_session_maker
-from src.database.models import Job, Application, JobStatus
+from src.database.models import Job, Application, JobRequirementsRecord, JobStatus
+from src.intelligence.batching import FitBatcher
+from src.intelligence.cache import LLMCache
+from src.intelligence.checkpoint import open_checkpointer
+from src.intelligence.embeddings import JobRanker
 from src.intelligence.engine import IntelligenceEngine
 from src.intelligence.graph import ApplicationWorkflow
-from src.intelligence.models import UserProfile
+from src.intelligence.models import JobPosting, JobRequirements
+from src.intelligence.profile import load_user_profile
+from src.intelligence.prefilter import SkillPrefilter
+from src.intelligence.ratelimit import LLMRateLimiter
 from src.generator.renderer import PDFGenerator
+from src.queues.arq_queue import ArqQueue
+from src.queues.backpressure import BackpressureGate
+from src.queues.factory import get_queue
+from src.queues.priority import job_priority
+from src.queues.reliable import Message
 
 logger = logging.getLogger(__name__)
 
+def _optional_env(cast, name: str):
+    value = os.getenv(name)
+    return cast(value) if value else None
+
 class JobProcessor:
-    def __init__(self):
+    def __init__(self, concurrency: Optional[int] = None):
+        self.concurrency = concurrency or int(os.getenv("WORKER_CONCURRENCY", 8))
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._stopping = asyncio.Event()
         self.redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
-        self.engine = IntelligenceEngine(model_provider="openai") # Or env var
-        self.workflow = ApplicationWorkflow(self.engine)
-        self.pdf_generator = PDFGenerator()
-        
-        # Mock User Profile for V1 - typically loaded from DB
-        self.user_profile = UserProfile(
-            full_name="Margulan Baizhakyp",
-            email="margulan@example.com",
-            phone="+1-555-0199",
-            linkedin_url="linkedin.com/in/margulan",
-            github_url="github.com/margulan",
-            skills=["Python", "FastAPI", "React", "AWS", "Docker"],
-            experience_summary="Senior Software Engineer with 5 years of experience...",
-            resume_raw_text="Experienced in building scalable web applications..."
+        self.raw_queue = get_queue(self.redis, "raw_job_queue")
+        self.apply_queue = get_queue(self.redis, "apply_queue")
+        self.apply_gate = BackpressureGate.from_env(self.apply_queue)
+        # Set FIT_CASCADE_BAND to score with a small model first and escalate only near the threshold
+        self.engine = IntelligenceEngine(
+            model_provider="openai",
+            cache=LLMCache.from_env(),
+            rate_limiter=LLMRateLimiter.from_env(),
+            cascade_band=_optional_env(int, "FIT_CASCADE_BAND"),
+        ) # Or env var
+        fit_batch_size = int(os.getenv("FIT_BATCH_SIZE", 1))
+        self.fit_batcher = FitBatcher(
+            self.engine,
+            max_batch_size=fit_batch_size,
+            max_wait=float(os.getenv("FIT_BATCH_MAX_WAIT_SECONDS", 0.2)),
+            mode=os.getenv("FIT_BATCH_MODE", "concurrent"),
+        ) if fit_batch_size > 1 else None
+        self.ranker = JobRanker()
+        # Opt-in hard reject on profile similarity; hashing similarities are too noisy to reject on
+        min_similarity = _optional_env(float, "MIN_PROFILE_SIMILARITY")
+        if min_similarity is not None and self.ranker.embedder.name == "hashing":
+            logger.warning("Ignoring MIN_PROFILE_SIMILARITY: it needs EMBEDDER=openai, not the hashing embedder")
+            min_similarity = None
+        self.workflow = ApplicationWorkflow(
+            self.engine,
+            prefilter=SkillPrefilter.from_env(),
+            min_similarity=min_similarity,
+            fit_batcher=self.fit_batcher,
+            token_budget=int(os.getenv("DESCRIPTION_TOKEN_BUDGET", 1500)),
+            speculative_min_prefilter_score=_optional_env(int, "SPECULATIVE_MIN_PREFILTER_SCORE"),
+            speculative_min_similarity=_optional_env(float, "SPECULATIVE_MIN_SIMILARITY"),
+            stored_reject_below=int(os.getenv("STORED_REQUIREMENTS_REJECT_BELOW", 25)),
+            stored_apply_at=int(os.getenv("STORED_REQUIREMENTS_APPLY_AT", 90)),
         )
+        self.pdf_generator = PDFGenerator()
+        self.user_profile = load_user_profile()
+
+    def request_shutdown(self):
+        """Stop taking new jobs; in-flight jobs are drained before run() returns."""
+        if not self._stopping.is_set():
+            logger.info("Shutdown requested. Draining in-flight jobs...")
+            self._stopping.set()
+
+    async def _handle(self, message: Message):
+        try:
+            async with self.raw_queue.lease(message):
+                await self.process_job(json.loads(message.payload))
+            await self.raw_queue.ack(message)
+        except Exception as e:
+            logger.error(f"Failed to process job: {e}", exc_info=True)
+            await self.raw_queue.nack(message, repr(e))
+        finally:
+            self._slots.release()
 
     async def run(self):
-        logger.info("Worker started. Listening on raw_job_queue...")
-        while True:
-            # Blocking pop
-            item = await self.redis.brpop("raw_job_queue", timeout=5)
-            if not item:
-                continue
-            
-            _, data_str = item
-            try:
-                job_data = json.loads(data_str)
-                await self.process_job(job_data)
-            except Exception as e:
-                logger.error(f"Failed to process job: {e}", exc_info=True)
+        if isinstance(self.raw_queue, ArqQueue):
+            raise RuntimeError(
+                "QUEUE_TRANSPORT=arq hands raw_job_queue to arq; run `arq src.worker.IntelligenceWorker` instead"
+            )
+        # CHECKPOINT_URL makes the workflow durable, so redelivered jobs resume instead of starting over
+        async with open_checkpointer() as checkpointer:
+            if checkpointer:
+                self.workflow.use_checkpointer(checkpointer)
+            await self._consume()
+
+    async def _consume(self):
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.request_shutdown)
+
+        logger.info(f"Worker started with concurrency {self.concurrency}. Listening on raw_job_queue...")
+        in_flight = set()
+        reaper = asyncio.create_task(self.raw_queue.run_reaper(self._stopping))
+        try:
+            while not self._stopping.is_set():
+                # Only pop when a slot is free so queued items stay visible to other workers
+                await self._slots.acquire()
+                # Stop taking raw jobs while the agent stage is backed up; raw_job_queue then fills
+                # and throttles the scout in turn
+                await self.apply_gate.wait(self._stopping)
+                if self._stopping.is_set():
+                    self._slots.release()
+                    break
+
+                message = await self.raw_queue.pop(timeout=1)
+                if not message:
+                    self._slots.release()
+                    continue
+
+                task = asyncio.create_task(self._handle(message))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        finally:
+            if in_flight:
+                logger.info(f"Waiting for {len(in_flight)} in-flight jobs to finish")
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            reaper.cancel()
+            await asyncio.gather(reaper, return_exceptions=True)
+            await self.close()
+
+    async def close(self):
+        """Flush batched work, log stats and release clients. Also used by the arq worker's shutdown hook."""
+        if self.fit_batcher:
+            await self.fit_batcher.close()
+            logger.info(f"Fit batching stats: {self.fit_batcher.stats()}")
+        logger.info(f"Fit analysis model stats: {self.engine.stats()}")
+        if self.apply_gate.throttle_events:
+            logger.info(f"Backpressure from apply_queue: {self.apply_gate.stats()}")
+        if self.workflow.speculation["started"]:
+            logger.info(f"Speculative tailoring stats: {self.workflow.speculation}")
+        if self.engine.cache:
+            logger.info(f"LLM cache stats: {self.engine.cache.stats()}")
+        if self.engine.rate_limiter:
+            logger.info(f"LLM rate limiter stats: {self.engine.rate_limiter.stats()}")
+            await self.engine.rate_limiter.close()
+        await self.raw_queue.close()
+        await self.apply_queue.close()
+        await self.redis.aclose()
+        logger.info("Worker stopped.")
 
     async def process_job(self, job_data: dict):
         logger.info(f"Processing job: {job_data.get('title')}")
         
         async with async_session_maker() as session:
-            # 1. Save Discovered Job to DB
-            job = Job(
-                platform_job_id=str(job_data.get("platform_job_id")),
-                platform=job_data.get("platform"),
-                title=job_data.get("title"),
-                company=job_data.get("company"),
-                url=job_data.get("url"),
-                status=JobStatus.DISCOVERED,
-                # In real scenario, we'd fetch full description here if missing
-                # For V1 we assume scout scraped it or we fetch it now.
-                # Let's assume description is just title for MVP testing if missing
-                description_text=job_data.get("description", job_data.get("title")) 
+            # Reposted or re-scouted jobs would violate the unique platform_job_id
+            job = await session.scalar(
+                select(Job)
+                .options(selectinload(Job.requirements))
+                .where(Job.platform_job_id == str(job_data.get("platform_job_id")))
             )
-            session.add(job)
-            await session.commit()
-            
+            if job and job.status == JobStatus.TAILORED:
+                # Committed on an earlier attempt that failed (or died) before its push to apply_queue
+                # went through. Pushing again is safe: the agent claims a TAILORED job only once
+                app = await session.scalar(
+                    select(Application).where(Application.job_id == job.id).order_by(Application.id.desc()).limit(1)
+                )
+                if app:
+                    logger.info(f"Re-queueing application {app.id} for already tailored job {job.id}")
+                    await self._queue_application(job, app, job_data)
+                    await self.workflow.forget(f"job-{job.id}")
+                    return
+            if job and job.status != JobStatus.DISCOVERED:
+                logger.info(f"Skipping job {job_data.get('platform_job_id')}: already stored as Job {job.id}")
+                return
+
+            stored = None
+            if job:
+                # Stored but never decided: a worker died or failed mid-workflow and the job was redelivered.
+                # With a checkpointer the workflow resumes where it stopped, otherwise it starts over
+                logger.info(f"Retrying undecided job {job.id}")
+                stored = job.requirements
+            else:
+                job = await self._store_job(session, job_data)
+
             # 2. Run Intelligence Workflow
             state = {
-                "job": job,
+                "job": JobPosting.model_validate(job),
                 "user_profile": self.user_profile
             }
-            
-            result = await self.workflow.workflow.ainvoke(state)
+            if stored:
+                # Extracted on an earlier attempt; feeds tailoring and the prefilter score
+                state["requirements"] = JobRequirements.model_validate(stored)
+
+            async def save_requirements(node: str, update: dict):
+                # Commit as soon as they're extracted so a retry after a tailoring or PDF failure reuses them
+                nonlocal stored
+                if stored is None and update.get("requirements"):
+                    stored = await self._save_requirements(session, job, update["requirements"])
+
+            thread_id = f"job-{job.id}"
+            result = await self.workflow.ainvoke(state, thread_id=thread_id, on_update=save_requirements)
             
             decision = result["decision"]
             job.fit_score = result["fit_analysis"].score
             job.fit_reasoning = result["fit_analysis"].reasoning
+
+            if stored is None and result.get("requirements"):
+                # Checkpointed result from an earlier run that never got to commit them
+                stored = await self._save_requirements(session, job, result["requirements"])
             
             if decision == "APPLY":
                 job.status = JobStatus.TAILORED
@@ -96,7 +235,9 @@ class JobProcessor:
                 filename = f"{job.id}_resume.pdf"
                 output_path = os.path.join(output_dir, filename)
                 
-                self.pdf_generator.generate_resume(
+                # WeasyPrint is CPU-bound; keep it off the event loop so other jobs keep moving
+                await asyncio.to_thread(
+                    self.pdf_generator.generate_resume,
                     self.user_profile,
                     tailored_content,
                     job.title,
@@ -115,9 +256,8 @@ class JobProcessor:
                 
                 log_event("application_generated", {"job_id": job.id, "score": job.fit_score})
                 
-                # 5. Push to Apply Queue
-                await self.redis.lpush("apply_queue", app.id)
-                logger.info(f"Pushed Application {app.id} to apply_queue")
+                # 5. Push to Apply Queue. If this fails the job is retried and re-pushed from TAILORED above
+                await self._queue_application(job, app, job_data)
 
             else:
                 job.status = JobStatus.REJECTED
@@ -125,6 +265,41 @@ class JobProcessor:
                 log_event("job_rejected", {"job_id": job.id, "score": job.fit_score})
                 await session.commit()
 
+            # Outcome is durable in the DB now; the checkpoints are no longer needed
+            await self.workflow.forget(thread_id)
+
+    async def _queue_application(self, job: Job, app: Application, job_data: dict):
+        # Best fits on the freshest postings reach the (slow) agent stage first
+        await self.apply_queue.push(str(app.id), priority=job_priority(job.fit_score, job_data.get("posted_at")))
+        logger.info(f"Pushed Application {app.id} to apply_queue")
+
+    async def _save_requirements(self, session: AsyncSession, job: Job, requirements: JobRequirements) -> JobRequirementsRecord:
+        record = JobRequirementsRecord(job_id=job.id, **requirements.model_dump())
+        session.add(record)
+        await session.commit()
+        return record
+
+    async def _store_job(self, session: AsyncSession, job_data: dict) -> Job:
+        # 1. Save Discovered Job to DB
+        job = Job(
+            platform_job_id=str(job_data.get("platform_job_id")),
+            platform=job_data.get("platform"),
+            title=job_data.get("title"),
+            company=job_data.get("company"),
+            url=job_data.get("url"),
+            status=JobStatus.DISCOVERED,
+            # Filled by the description fetch stage (src.scout.details); fall back to the title
+            # for jobs that were queued without it
+            description_html=job_data.get("description_html"),
+            description_text=job_data.get("description_text") or job_data.get("description", job_data.get("title"))
+        )
+        session.add(job)
+
+        # Embed and score against the profile; the vector is kept for similarity search
+        await self.ranker.embed_jobs([job], self.user_profile)
+        await session.commit()
+        return job
+
 if __name__ == "__main__":
     logging.basicConfig(level=logging.INFO)
     processor = JobProcessor()
@@ -0,0 +1,101 @@
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from redis.asyncio import Redis
+from src.queues.priority import payload_priority, priority_skills
+from src.queues.reliable import ReliableQueue
+
+logger = logging.getLogger(__name__)
+
+# Queues consumed by arq workers (src.worker) and the task each item is handed to
+ARQ_TASKS = {
+    "raw_job_queue": "process_job",
+    "apply_queue": "process_application",
+}
+
+def arq_queue_name(name: str) -> str:
+    return f"arq:{name}"
+
+def arq_health_check_key(name: str) -> str:
+    return f"{arq_queue_name(name)}:health-check"
+
+class ArqQueue(ReliableQueue):
+    """
+    Producer side of a queue consumed by arq workers: push() enqueues the queue's task with the
+    payload as its only argument on `arq:<name>`.
+
+    arq runs ready jobs in score order, so priorities become an earlier score with the same aging
+    as PriorityQueue. Leases, retries and timeouts are arq's; only dead letters stay on `name:dead`,
+    written by the worker once a job has used up its tries, so the dead-letter API works unchanged.
+    """
+    READY_TYPE = "arq"
+
+    def __init__(self, redis: Redis, name: str, aging_seconds: float = 60.0, **kwargs):
+        super().__init__(redis, name, **kwargs)
+        if name not in ARQ_TASKS:
+            raise ValueError(f"No arq task consumes {name}")
+        self.function = ARQ_TASKS[name]
+        self.queue_name = arq_queue_name(name)
+        self.aging_seconds = aging_seconds
+        self._pool = None
+
+    @classmethod
+    def from_env(cls, redis: Redis, name: str, **overrides) -> "ArqQueue":
+        overrides.setdefault("aging_seconds", float(os.getenv("QUEUE_PRIORITY_AGING_SECONDS", 60)))
+        return super().from_env(redis, name, **overrides)
+
+    async def _arq(self):
+        # arq pickles jobs, so it needs its own binary-safe connection pool
+        if self._pool is None:
+            from arq import create_pool
+            from arq.connections import RedisSettings
+
+            self._pool = await create_pool(
+                RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+            )
+        return self._pool
+
+    async def push_many(self, payloads: Iterable[str], pipeline=None, priorities: Optional[Iterable[float]] = None):
+        """Enqueue one arq job per payload. `pipeline` is ignored: arq enqueues in its own transactions."""
+        payloads = list(payloads)
+        if not payloads:
+            return
+        pool = await self._arq()
+        priorities = list(priorities) if priorities is not None else [0.0] * len(payloads)
+        now = time.time()
+        for payload, priority in zip(payloads, priorities):
+            run_at = datetime.fromtimestamp(now - self.aging_seconds * priority, tz=timezone.utc)
+            await pool.enqueue_job(self.function, payload, _queue_name=self.queue_name, _defer_until=run_at)
+
+    async def _requeue(self, payload: str, message_id: Optional[str]):
+        # Dead letters are recorded under arq's job id, which arq won't reuse while it keeps the result
+        await self.push(payload, priority=payload_priority(payload, priority_skills()))
+
+    async def reap(self, limit: int = 100) -> dict:
+        # arq re-runs jobs whose worker died once their in-progress key expires
+        return {"requeued": 0, "dead_lettered": 0, "released": 0}
+
+    async def dead_letter(self, message_id: str, payload: str, attempts: int, error: Optional[str] = None):
+        await self.redis.lpush(self.dead_key, json.dumps({
+            "id": message_id, "payload": payload, "attempts": attempts, "error": error, "failed_at": time.time(),
+        }))
+        logger.error(f"Dead-lettered {self.name} item {message_id} after {attempts} attempts: {error}")
+
+    async def depth(self) -> dict:
+        now_ms = time.time() * 1000
+        async with self.redis.pipeline(transaction=False) as pipe:
+            # Running jobs stay in arq's queue until they finish, so they're counted as ready here
+            pipe.zcount(self.queue_name, "-inf", now_ms)
+            pipe.zcount(self.queue_name, f"({now_ms}", "+inf")
+            pipe.llen(self.dead_key)
+            pipe.get(arq_health_check_key(self.name))
+            ready, delayed, dead, health = await pipe.execute()
+        return {"ready": ready, "in_flight": 0, "delayed": delayed, "dead": dead, "workers": health}
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.aclose()
+            self._pool = None
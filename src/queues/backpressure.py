@@ -0,0 +1,153 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from typing import Optional
+from src.queues.reliable import ReliableQueue
+
+logger = logging.getLogger(__name__)
+
+# (high, low) backlog watermarks per queue. The agent stage is by far the slowest (browser, vision,
+# human review), so apply_queue is kept short: anything queued there for hours may have closed.
+DEFAULT_WATERMARKS = {
+    "discovered_job_queue": (2000, 1000),
+    "raw_job_queue": (1000, 500),
+    "apply_queue": (50, 25),
+}
+
+class BackpressureGate:
+    """
+    Pauses a producer while the queue it feeds is backed up.
+
+    wait() returns immediately while the queue's backlog (ready + in flight + delayed) is under
+    `high_watermark`. Once it reaches it, wait() blocks until the backlog drains to `low_watermark`,
+    so producers resume in one go instead of flapping around a single threshold. Concurrent callers
+    in one process share the gate: while one of them checks depth or waits out a stall, the others
+    wait with it. Time spent throttled is added to the `name:backpressure` hash so every producer's
+    stalls show up in one place.
+    """
+    def __init__(
+        self,
+        queue: ReliableQueue,
+        high_watermark: int,
+        low_watermark: Optional[int] = None,
+        poll_interval: float = 2.0,
+        check_interval: float = 1.0,
+    ):
+        self.queue = queue
+        self.high_watermark = high_watermark
+        self.low_watermark = min(low_watermark if low_watermark is not None else high_watermark // 2, high_watermark)
+        self.poll_interval = poll_interval
+        self.check_interval = check_interval
+        self.metrics_key = f"{queue.name}:backpressure"
+        self.throttle_events = 0
+        self.throttled_seconds = 0.0
+        self._checked_at = 0.0
+        # Cleared while a caller is checking depth or throttled; everyone else waits on it
+        self._open = asyncio.Event()
+        self._open.set()
+
+    @classmethod
+    def from_env(cls, queue: ReliableQueue) -> "BackpressureGate":
+        """
+        QUEUE_WATERMARKS overrides the defaults per queue, e.g. {"apply_queue": {"high": 100, "low": 40}}.
+        A high watermark of 0, or QUEUE_BACKPRESSURE=none, lets producers push without limit.
+        """
+        high, low = DEFAULT_WATERMARKS.get(queue.name, (0, 0))
+        override = json.loads(os.getenv("QUEUE_WATERMARKS", "{}")).get(queue.name, {})
+        high = int(override.get("high", high))
+        low = int(override.get("low", low if "high" not in override else high // 2))
+        if os.getenv("QUEUE_BACKPRESSURE", "on") == "none":
+            high = 0
+        return cls(queue, high, low, poll_interval=float(os.getenv("QUEUE_BACKPRESSURE_POLL_SECONDS", 2.0)))
+
+    @property
+    def enabled(self) -> bool:
+        return self.high_watermark > 0
+
+    @staticmethod
+    def backlog_of(depth: dict) -> int:
+        # "ready" is None on streams with Redis < 7 (no consumer group lag); count what we can
+        return (depth.get("ready") or 0) + depth.get("in_flight", 0) + depth.get("delayed", 0)
+
+    async def backlog(self) -> int:
+        return self.backlog_of(await self.queue.depth())
+
+    async def wait(self, stop: Optional[asyncio.Event] = None) -> float:
+        """Block while the queue is over its high watermark. Returns the seconds spent throttled."""
+        if not self.enabled:
+            return 0.0
+        if not self._open.is_set():
+            return await self._follow(stop)
+        # Checking depth on every push would cost a round trip per item; a second of slack is plenty
+        if time.monotonic() - self._checked_at < self.check_interval:
+            return 0.0
+        self._checked_at = time.monotonic()
+        self._open.clear()
+        try:
+            return await self._throttle(stop)
+        finally:
+            self._open.set()
+
+    async def _follow(self, stop: Optional[asyncio.Event]) -> float:
+        started = time.monotonic()
+        waiters = [asyncio.ensure_future(self._open.wait())]
+        if stop:
+            waiters.append(asyncio.ensure_future(stop.wait()))
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+        return time.monotonic() - started
+
+    async def _throttle(self, stop: Optional[asyncio.Event]) -> float:
+        backlog = await self.backlog()
+        if backlog < self.high_watermark:
+            return 0.0
+
+        logger.warning(
+            f"{self.queue.name} backlog {backlog} reached its high watermark {self.high_watermark}; "
+            f"pausing until it drains to {self.low_watermark}"
+        )
+        self.throttle_events += 1
+        await self.queue.redis.hincrby(self.metrics_key, "throttle_events", 1)
+        started = last = time.monotonic()
+        while backlog > self.low_watermark and not (stop and stop.is_set()):
+            if stop:
+                try:
+                    await asyncio.wait_for(stop.wait(), self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await asyncio.sleep(self.poll_interval)
+            # Record as we go so a long stall is visible while it's happening
+            now = time.monotonic()
+            await self.queue.redis.hincrbyfloat(self.metrics_key, "throttled_seconds", now - last)
+            last = now
+            backlog = await self.backlog()
+
+        waited = time.monotonic() - started
+        self.throttled_seconds += waited
+        self._checked_at = time.monotonic()
+        logger.info(f"Resuming pushes to {self.queue.name} after {waited:.1f}s (backlog {backlog})")
+        return waited
+
+    async def metrics(self, depth: Optional[dict] = None) -> dict:
+        """Watermarks, current backlog and throttling totals across all producers of this queue."""
+        depth = depth if depth is not None else await self.queue.depth()
+        totals = await self.queue.redis.hgetall(self.metrics_key)
+        backlog = self.backlog_of(depth)
+        return {
+            "high_watermark": self.high_watermark,
+            "low_watermark": self.low_watermark,
+            "backlog": backlog,
+            "over_high_watermark": self.enabled and backlog >= self.high_watermark,
+            "throttle_events": int(totals.get("throttle_events", 0)),
+            "throttled_seconds": round(float(totals.get("throttled_seconds", 0)), 1),
+        }
+
+    def stats(self) -> dict:
+        """Throttling seen by this producer only."""
+        return {"throttle_events": self.throttle_events, "throttled_seconds": round(self.throttled_seconds, 1)}
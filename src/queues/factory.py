@@ -0,0 +1,26 @@
+import os
+from redis.asyncio import Redis
+from src.queues.arq_queue import ARQ_TASKS, ArqQueue
+from src.queues.priority import PriorityQueue
+from src.queues.reliable import ReliableQueue
+from src.queues.streams import StreamQueue
+
+def get_queue(redis: Redis, name: str, **overrides) -> ReliableQueue:
+    """
+    Queue implementation selected by QUEUE_TRANSPORT, shared by producers and consumers:
+    "priority" (default) for sorted-set priority scheduling with aging, "list" for plain FIFO,
+    "streams" for Redis Streams consumer groups when workers run on several nodes, "arq" to hand
+    raw_job_queue and apply_queue to arq workers (src.worker); other queues then use "priority".
+    """
+    transport = os.getenv("QUEUE_TRANSPORT", "priority")
+    if transport == "arq":
+        if name in ARQ_TASKS:
+            return ArqQueue.from_env(redis, name, **overrides)
+        transport = "priority"
+    if transport == "priority":
+        return PriorityQueue.from_env(redis, name, **overrides)
+    if transport == "list":
+        return ReliableQueue.from_env(redis, name, **overrides)
+    if transport == "streams":
+        return StreamQueue.from_env(redis, name, **overrides)
+    raise ValueError(f"Unknown QUEUE_TRANSPORT '{transport}'")
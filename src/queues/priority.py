@@ -0,0 +1,179 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Sequence, Union
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from src.intelligence.prefilter import SkillPrefilter
+from src.intelligence.profile import load_user_profile
+from src.queues.reliable import Message, ReliableQueue
+
+logger = logging.getLogger(__name__)
+
+# Take the lowest-scored item and lease it in one step, so a crash can't drop it between the two
+POP_SCRIPT = """
+local queue, processing, leases, owners = KEYS[1], KEYS[2], KEYS[3], KEYS[4]
+local deadline = tonumber(ARGV[1])
+local consumer = ARGV[2]
+local item = redis.call('ZRANGE', queue, 0, 0, 'WITHSCORES')
+if #item == 0 then
+    return false
+end
+redis.call('ZREM', queue, item[1])
+redis.call('LPUSH', processing, item[1])
+redis.call('ZADD', leases, deadline, item[1])
+redis.call('HSET', owners, item[1], consumer)
+return item
+"""
+
+class PriorityQueue(ReliableQueue):
+    """
+    ReliableQueue whose ready set is a sorted set popped lowest score first.
+
+    score = enqueue time - aging_seconds * priority, so each priority point is worth `aging_seconds`
+    of waiting. A high-priority item jumps ahead of older ones, but only by a bounded amount of
+    time: anything that has waited long enough eventually outranks new arrivals and isn't starved.
+    Leases, retries (which keep their original score) and dead-lettering work as in ReliableQueue.
+    """
+    READY_TYPE = "zset"
+
+    def __init__(self, redis: Redis, name: str, aging_seconds: float = 60.0, poll_interval: float = 0.2, **kwargs):
+        super().__init__(redis, name, **kwargs)
+        self.aging_seconds = aging_seconds
+        self.poll_interval = poll_interval
+        self._pop = redis.register_script(POP_SCRIPT)
+        self._checked_type = False
+
+    @classmethod
+    def from_env(cls, redis: Redis, name: str, **overrides) -> "PriorityQueue":
+        """QUEUE_PRIORITY_AGING_SECONDS sets how much waiting one priority point is worth."""
+        overrides.setdefault("aging_seconds", float(os.getenv("QUEUE_PRIORITY_AGING_SECONDS", 60)))
+        return super().from_env(redis, name, **overrides)
+
+    def score(self, priority: float, enqueued_at: Optional[float] = None) -> float:
+        return (enqueued_at or time.time()) - self.aging_seconds * priority
+
+    async def push_many(
+        self, payloads: Iterable[str], pipeline=None, priorities: Optional[Iterable[float]] = None
+    ):
+        payloads = list(payloads)
+        if not payloads:
+            return
+        await self._upgrade_list()
+        priorities = list(priorities) if priorities is not None else [0.0] * len(payloads)
+        now = time.time()
+        mapping = {}
+        for payload, priority in zip(payloads, priorities):
+            score = self.score(priority, now)
+            mapping[self.encode(payload, score=score)] = score
+        if pipeline is not None:
+            pipeline.zadd(self.name, mapping)
+        else:
+            await self.redis.zadd(self.name, mapping)
+
+    async def pop(self, timeout: float = 1.0) -> Optional[Message]:
+        """Lease the highest-priority item, polling for up to `timeout` seconds when the queue is empty."""
+        await self._upgrade_list()
+        deadline = time.monotonic() + timeout
+        while True:
+            item = await self._pop(
+                keys=[self.name, self.processing_key, self.leases_key, self.owners_key],
+                args=[time.time() + self.visibility_timeout, self.consumer],
+            )
+            if item:
+                message = self.decode(item[0])
+                if message.score is None:
+                    message.score = float(item[1])
+                return message
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.poll_interval, remaining))
+
+    async def _upgrade_list(self):
+        """
+        Move items left in a FIFO list under the same key (before priority scheduling) into the sorted
+        set, via `name:legacy`. Leftovers from an upgrade that stopped partway are drained too.
+        """
+        if self._checked_type:
+            return
+        self._checked_type = True
+        legacy_key = f"{self.name}:legacy"
+        if await self.redis.type(self.name) == "list":
+            try:
+                if not await self.redis.renamenx(self.name, legacy_key):
+                    # An earlier upgrade stopped partway; queue ours behind what it left
+                    while await self.redis.lmove(self.name, legacy_key, "RIGHT", "LEFT"):
+                        pass
+            except ResponseError:
+                # Another consumer moved the list first; help it drain below
+                pass
+
+        moved = 0
+        while raw := await self.redis.rpop(legacy_key):
+            message = self.decode(raw)
+            score = self.score(0.0)
+            await self.redis.zadd(self.name, {self.encode(message.payload, message.attempts, message.id, score): score})
+            moved += 1
+        if moved:
+            logger.info(f"Moved {moved} items from the {self.name} list into its priority queue")
+
+    async def _requeue(self, payload: str, message_id: Optional[str]):
+        # The original score is gone with the dead letter; work it out again from the payload
+        score = self.score(payload_priority(payload, priority_skills()))
+        await self.redis.zadd(self.name, {self.encode(payload, 0, message_id, score): score})
+
+def posting_age_hours(posted_at: Union[str, datetime, None], now: Optional[datetime] = None) -> Optional[float]:
+    if not posted_at:
+        return None
+    if isinstance(posted_at, str):
+        try:
+            posted_at = datetime.fromisoformat(posted_at)
+        except ValueError:
+            return None
+    if posted_at.tzinfo is None:
+        posted_at = posted_at.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max((now - posted_at).total_seconds() / 3600, 0.0)
+
+def job_priority(score: Optional[float], posted_at: Union[str, datetime, None] = None) -> float:
+    """
+    A 0-100 relevance score minus POSTING_AGE_PENALTY points (default 0.5) per hour since posting,
+    so fresh postings, where early applicants still stand out, go first among equals. The penalty
+    is capped at POSTING_AGE_PENALTY_MAX points so stale postings are demoted, not starved.
+    """
+    age = posting_age_hours(posted_at)
+    if age is None:
+        return score or 0.0
+    penalty = min(float(os.getenv("POSTING_AGE_PENALTY", 0.5)) * age, float(os.getenv("POSTING_AGE_PENALTY_MAX", 50)))
+    return (score or 0.0) - penalty
+
+def raw_job_priority(job_data: dict, skills: Sequence[str] = ()) -> float:
+    """
+    Priority for raw_job_queue: the job's similarity score when it already has one, otherwise the
+    share of `skills` (see priority_skills) its title and description mention.
+    """
+    if job_data.get("similarity_score") is not None:
+        score = 100 * float(job_data["similarity_score"])
+    elif skills:
+        text = f"{job_data.get('title') or ''}\n{job_data.get('description_text') or ''}"
+        score = SkillPrefilter(min_skill_matches=0).evaluate(text, skills).score
+    else:
+        score = 0.0
+    return job_priority(score, job_data.get("posted_at"))
+
+def payload_priority(payload: str, skills: Sequence[str] = ()) -> float:
+    """Priority for a queued payload: job dicts are scored as in raw_job_priority, anything else (application ids) gets 0."""
+    try:
+        job_data = json.loads(payload)
+    except ValueError:
+        return 0.0
+    return raw_job_priority(job_data, skills) if isinstance(job_data, dict) else 0.0
+
+def priority_skills() -> Sequence[str]:
+    """Skills jobs without a similarity score are ranked by: PRIORITY_SKILLS (comma separated), else the profile's."""
+    override = [skill.strip() for skill in os.getenv("PRIORITY_SKILLS", "").split(",") if skill.strip()]
+    return override or load_user_profile().skills
@@ -0,0 +1,309 @@
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterable, List, Optional
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+# Requeue items whose lease expired (their worker died or hung) and release delayed retries that are
+# due. An item that keeps timing out is dead-lettered after max_attempts like any other failure.
+# The ready queue is a list, or a sorted set (ARGV[5] == 'zset') where items go back at their original score.
+REAP_SCRIPT = """
+local queue, leases, owners, delayed, dead = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local now = tonumber(ARGV[1])
+local limit = tonumber(ARGV[2])
+local max_attempts = tonumber(ARGV[3])
+local processing_prefix = ARGV[4]
+local sorted = ARGV[5] == 'zset'
+
+local requeued, dead_lettered = 0, 0
+for _, raw in ipairs(redis.call('ZRANGEBYSCORE', leases, '-inf', now, 'LIMIT', 0, limit)) do
+    local consumer = redis.call('HGET', owners, raw)
+    if consumer then
+        redis.call('LREM', processing_prefix .. consumer, 1, raw)
+    end
+    redis.call('ZREM', leases, raw)
+    redis.call('HDEL', owners, raw)
+
+    local ok, message = pcall(cjson.decode, raw)
+    if not ok or type(message) ~= 'table' then
+        message = {id = raw, payload = raw, attempts = 0}
+    end
+    message['attempts'] = (tonumber(message['attempts']) or 0) + 1
+    if message['attempts'] >= max_attempts then
+        message['error'] = 'visibility timeout expired'
+        message['failed_at'] = now
+        redis.call('LPUSH', dead, cjson.encode(message))
+        dead_lettered = dead_lettered + 1
+    elseif sorted then
+        redis.call('ZADD', queue, tonumber(message['score']) or now, cjson.encode(message))
+        requeued = requeued + 1
+    else
+        -- Consumers pop from the right, so this puts the item back at the front of the line
+        redis.call('RPUSH', queue, cjson.encode(message))
+        requeued = requeued + 1
+    end
+end
+
+local due = redis.call('ZRANGEBYSCORE', delayed, '-inf', now, 'LIMIT', 0, limit)
+for _, raw in ipairs(due) do
+    redis.call('ZREM', delayed, raw)
+    if sorted then
+        local ok, message = pcall(cjson.decode, raw)
+        redis.call('ZADD', queue, (ok and type(message) == 'table' and tonumber(message['score'])) or now, raw)
+    else
+        redis.call('LPUSH', queue, raw)
+    end
+end
+return {requeued, dead_lettered, #due}
+"""
+
+# Lease every item in one consumer's processing list that has no lease yet. Reading the list in the
+# script means an item acked meanwhile can't be leased again and later requeued as a duplicate.
+ADOPT_SCRIPT = """
+local processing, leases, owners = KEYS[1], KEYS[2], KEYS[3]
+local deadline = tonumber(ARGV[1])
+local consumer = ARGV[2]
+local adopted = 0
+for _, raw in ipairs(redis.call('LRANGE', processing, 0, -1)) do
+    if redis.call('ZADD', leases, 'NX', deadline, raw) == 1 then
+        redis.call('HSET', owners, raw, consumer)
+        adopted = adopted + 1
+    end
+end
+return adopted
+"""
+
+@dataclass
+class Message:
+    id: str
+    payload: str
+    attempts: int
+    raw: str
+    # Position in a sorted-set queue, kept across retries
+    score: Optional[float] = None
+
+def default_consumer_name() -> str:
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+class ReliableQueue:
+    """
+    At-least-once work queue on Redis lists.
+
+    Producers LPUSH JSON envelopes ({id, payload, attempts}) onto `name`. pop() BLMOVEs an item into
+    this consumer's `name:processing:<consumer>` list and leases it for `visibility_timeout` seconds;
+    the item stays there until ack(). nack() schedules a retry with exponential backoff on
+    `name:delayed`, or moves the item to the `name:dead` list after `max_attempts`. reap() puts
+    items whose lease expired back on the queue, so a crashed worker loses nothing.
+    """
+    READY_TYPE = "list"
+
+    def __init__(
+        self,
+        redis: Redis,
+        name: str,
+        consumer: Optional[str] = None,
+        visibility_timeout: float = 120.0,
+        max_attempts: int = 5,
+        backoff_base: float = 5.0,
+        backoff_max: float = 600.0,
+    ):
+        self.redis = redis
+        self.name = name
+        self.consumer = consumer or default_consumer_name()
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.processing_prefix = f"{name}:processing:"
+        self.processing_key = f"{self.processing_prefix}{self.consumer}"
+        self.leases_key = f"{name}:leases"
+        self.owners_key = f"{name}:owners"
+        self.delayed_key = f"{name}:delayed"
+        self.dead_key = f"{name}:dead"
+        self._reap = redis.register_script(REAP_SCRIPT)
+        self._adopt = redis.register_script(ADOPT_SCRIPT)
+
+    @classmethod
+    def from_env(cls, redis: Redis, name: str, **overrides) -> "ReliableQueue":
+        """QUEUE_VISIBILITY_TIMEOUT, QUEUE_MAX_ATTEMPTS and QUEUE_BACKOFF_SECONDS tune every queue alike."""
+        options = {
+            "visibility_timeout": float(os.getenv("QUEUE_VISIBILITY_TIMEOUT", 120)),
+            "max_attempts": int(os.getenv("QUEUE_MAX_ATTEMPTS", 5)),
+            "backoff_base": float(os.getenv("QUEUE_BACKOFF_SECONDS", 5)),
+        }
+        options.update(overrides)
+        return cls(redis, name, **options)
+
+    @staticmethod
+    def encode(payload: str, attempts: int = 0, message_id: Optional[str] = None, score: Optional[float] = None) -> str:
+        envelope = {"id": message_id or uuid.uuid4().hex, "payload": payload, "attempts": attempts}
+        if score is not None:
+            envelope["score"] = score
+        return json.dumps(envelope)
+
+    @staticmethod
+    def decode(raw: str) -> Message:
+        try:
+            envelope = json.loads(raw)
+        except ValueError:
+            envelope = None
+        if not isinstance(envelope, dict) or "payload" not in envelope:
+            # Pushed by something that doesn't know about envelopes
+            return Message(id=raw, payload=raw, attempts=0, raw=raw)
+        return Message(
+            envelope.get("id", raw), envelope["payload"], int(envelope.get("attempts", 0)), raw, envelope.get("score")
+        )
+
+    async def push(self, payload: str, priority: float = 0.0):
+        await self.push_many([payload], priorities=[priority])
+
+    async def push_many(self, payloads: Iterable[str], pipeline=None, priorities: Optional[Iterable[float]] = None):
+        """LPUSH several payloads in FIFO order (priorities are ignored). With `pipeline`, the command is only queued on it."""
+        raws = [self.encode(payload) for payload in payloads]
+        if not raws:
+            return
+        if pipeline is not None:
+            pipeline.lpush(self.name, *raws)
+        else:
+            await self.redis.lpush(self.name, *raws)
+
+    async def pop(self, timeout: float = 1.0) -> Optional[Message]:
+        """Block up to `timeout` seconds for the next item and lease it to this consumer."""
+        raw = await self.redis.blmove(self.name, self.processing_key, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return None
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.zadd(self.leases_key, {raw: time.time() + self.visibility_timeout})
+            pipe.hset(self.owners_key, raw, self.consumer)
+            await pipe.execute()
+        return self.decode(raw)
+
+    async def extend(self, message: Message):
+        """Push the lease deadline out again; call while still working on a long item."""
+        await self.redis.zadd(self.leases_key, {message.raw: time.time() + self.visibility_timeout}, xx=True)
+
+    @asynccontextmanager
+    async def lease(self, message: Message) -> AsyncIterator[Message]:
+        """Keep the lease alive for as long as the block runs, so slow work isn't mistaken for a crash."""
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(self.visibility_timeout / 3)
+                try:
+                    await self.extend(message)
+                except Exception as e:
+                    logger.warning(f"Failed to extend lease on {self.name} item {message.id}: {e}")
+
+        task = asyncio.create_task(heartbeat())
+        try:
+            yield message
+        finally:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def _release(self, pipe, message: Message):
+        pipe.lrem(self.processing_key, 1, message.raw)
+        pipe.zrem(self.leases_key, message.raw)
+        pipe.hdel(self.owners_key, message.raw)
+
+    async def ack(self, message: Message):
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._release(pipe, message)
+            await pipe.execute()
+
+    async def nack(self, message: Message, error: Optional[str] = None):
+        """Give the item back: retried after a backoff, or dead-lettered once it has used up its attempts."""
+        attempts = message.attempts + 1
+        async with self.redis.pipeline(transaction=True) as pipe:
+            self._release(pipe, message)
+            if attempts >= self.max_attempts:
+                pipe.lpush(self.dead_key, json.dumps({
+                    "id": message.id, "payload": message.payload, "attempts": attempts,
+                    "error": error, "failed_at": time.time(),
+                }))
+            else:
+                delay = min(self.backoff_base * 2 ** message.attempts, self.backoff_max)
+                retry = self.encode(message.payload, attempts, message.id, message.score)
+                pipe.zadd(self.delayed_key, {retry: time.time() + delay})
+            await pipe.execute()
+
+        if attempts >= self.max_attempts:
+            logger.error(f"Dead-lettered {self.name} item {message.id} after {attempts} attempts: {error}")
+        else:
+            logger.warning(f"Retrying {self.name} item {message.id} (attempt {attempts + 1}/{self.max_attempts}): {error}")
+
+    async def reap(self, limit: int = 100) -> dict:
+        """Requeue expired leases and release due retries. Safe to run from every worker."""
+        await self._adopt_orphans()
+        requeued, dead_lettered, released = await self._reap(
+            keys=[self.name, self.leases_key, self.owners_key, self.delayed_key, self.dead_key],
+            args=[time.time(), limit, self.max_attempts, self.processing_prefix, self.READY_TYPE],
+        )
+        if requeued or dead_lettered:
+            logger.warning(f"Reaped {self.name}: {requeued} requeued, {dead_lettered} dead-lettered after lease expiry")
+        return {"requeued": requeued, "dead_lettered": dead_lettered, "released": released}
+
+    async def _adopt_orphans(self):
+        """Lease items stranded in a processing list without one (consumer died between BLMOVE and lease)."""
+        async for key in self.redis.scan_iter(match=f"{self.processing_prefix}*", count=100):
+            consumer = key[len(self.processing_prefix):]
+            await self._adopt(
+                keys=[key, self.leases_key, self.owners_key],
+                args=[time.time() + self.visibility_timeout, consumer],
+            )
+
+    async def run_reaper(self, stop: asyncio.Event, interval: float = 10.0):
+        while not stop.is_set():
+            try:
+                await self.reap()
+            except Exception as e:
+                logger.error(f"Reaper for {self.name} failed: {e}")
+            try:
+                await asyncio.wait_for(stop.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def depth(self) -> dict:
+        async with self.redis.pipeline(transaction=False) as pipe:
+            if self.READY_TYPE == "zset":
+                pipe.zcard(self.name)
+            else:
+                pipe.llen(self.name)
+            pipe.zcard(self.leases_key)
+            pipe.zcard(self.delayed_key)
+            pipe.llen(self.dead_key)
+            ready, in_flight, delayed, dead = await pipe.execute()
+        return {"ready": ready, "in_flight": in_flight, "delayed": delayed, "dead": dead}
+
+    async def close(self):
+        """Release connections the queue opened itself; the Redis client passed in belongs to the caller."""
+
+    async def dead_letters(self, count: int = 50) -> List[dict]:
+        """Most recent dead-lettered items, newest first."""
+        return [json.loads(raw) for raw in await self.redis.lrange(self.dead_key, 0, count - 1)]
+
+    async def requeue_dead(self, count: int = 50) -> int:
+        """Give up to `count` of the oldest dead letters a fresh set of attempts."""
+        moved = 0
+        for _ in range(count):
+            raw = await self.redis.rpop(self.dead_key)
+            if raw is None:
+                break
+            item = json.loads(raw)
+            await self._requeue(item["payload"], item.get("id"))
+            moved += 1
+        return moved
+
+    async def _requeue(self, payload: str, message_id: Optional[str]):
+        # Same id as before, so logs and dead letters of both runs can be matched up
+        await self.redis.lpush(self.name, self.encode(payload, 0, message_id))
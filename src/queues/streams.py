@@ -0,0 +1,209 @@
+import json
+import logging
+import os
+import time
+import uuid
+from typing import Iterable, List, Optional
+from redis.asyncio import Redis
+from redis.exceptions import ResponseError
+from src.queues.reliable import Message, ReliableQueue
+
+logger = logging.getLogger(__name__)
+
+class StreamQueue(ReliableQueue):
+    """
+    ReliableQueue on a Redis Stream (`name:stream`) read through the consumer group `name:workers`.
+
+    Every worker on every node reads as its own consumer, so Redis tracks what each one holds:
+    pending entries stay in the group's PEL until ack(). reap() uses XAUTOCLAIM to take over entries
+    idle longer than `visibility_timeout` (their consumer died) and re-adds them, so any live worker
+    can pick them up. Retries, backoff and dead-lettering work as in ReliableQueue. The stream is
+    capped at roughly `maxlen` entries. Ordering is FIFO; priorities are ignored.
+    """
+    READY_TYPE = "stream"
+
+    def __init__(self, redis: Redis, name: str, maxlen: int = 100_000, **kwargs):
+        super().__init__(redis, name, **kwargs)
+        self.stream_key = f"{name}:stream"
+        self.group = f"{name}:workers"
+        self.lag_key = f"{name}:consumer_lag"
+        self.maxlen = maxlen
+        self._group_ready = False
+        # XAUTOCLAIM resumes from here, so a PEL larger than one reap's `limit` is still scanned to the end
+        self._claim_cursor = "0-0"
+
+    @classmethod
+    def from_env(cls, redis: Redis, name: str, **overrides) -> "StreamQueue":
+        """QUEUE_STREAM_MAXLEN caps each stream (approximately, so trimming stays cheap)."""
+        overrides.setdefault("maxlen", int(os.getenv("QUEUE_STREAM_MAXLEN", 100_000)))
+        return super().from_env(redis, name, **overrides)
+
+    async def _ensure_group(self):
+        if self._group_ready:
+            return
+        try:
+            # Start at 0 so entries added before the first worker started are still delivered
+            await self.redis.xgroup_create(self.stream_key, self.group, id="0", mkstream=True)
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+        self._group_ready = True
+
+    def _fields(self, payload: str, attempts: int = 0, message_id: Optional[str] = None) -> dict:
+        return {"id": message_id or uuid.uuid4().hex, "payload": payload, "attempts": attempts}
+
+    async def push_many(self, payloads: Iterable[str], pipeline=None, priorities: Optional[Iterable[float]] = None):
+        payloads = list(payloads)
+        if not payloads:
+            return
+        await self._ensure_group()
+        target = pipeline if pipeline is not None else self.redis.pipeline(transaction=False)
+        for payload in payloads:
+            target.xadd(self.stream_key, self._fields(payload), maxlen=self.maxlen, approximate=True)
+        if pipeline is None:
+            async with target:
+                await target.execute()
+
+    def _message(self, entry_id: str, fields: dict) -> Message:
+        return Message(
+            id=fields.get("id", entry_id),
+            payload=fields.get("payload", ""),
+            attempts=int(fields.get("attempts", 0)),
+            raw=entry_id,
+        )
+
+    async def _requeue(self, payload: str, message_id: Optional[str]):
+        await self._ensure_group()
+        await self.redis.xadd(self.stream_key, self._fields(payload, 0, message_id), maxlen=self.maxlen, approximate=True)
+
+    async def pop(self, timeout: float = 1.0) -> Optional[Message]:
+        await self._ensure_group()
+        response = await self.redis.xreadgroup(
+            self.group, self.consumer, {self.stream_key: ">"}, count=1, block=max(int(timeout * 1000), 1)
+        )
+        if not response:
+            return None
+        _, entries = response[0]
+        entry_id, fields = entries[0]
+        # Entry ids start with the ms timestamp of the XADD: record how far behind this consumer runs
+        lag = max(time.time() - int(entry_id.split("-")[0]) / 1000, 0.0)
+        await self.redis.hset(self.lag_key, self.consumer, round(lag, 3))
+        return self._message(entry_id, fields)
+
+    async def extend(self, message: Message):
+        # Re-claiming our own entry resets its idle time, which is what XAUTOCLAIM looks at
+        await self.redis.xclaim(self.stream_key, self.group, self.consumer, 0, [message.raw], justid=True)
+
+    async def ack(self, message: Message):
+        await self.redis.xack(self.stream_key, self.group, message.raw)
+
+    async def nack(self, message: Message, error: Optional[str] = None):
+        attempts = message.attempts + 1
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.xack(self.stream_key, self.group, message.raw)
+            if attempts >= self.max_attempts:
+                pipe.lpush(self.dead_key, json.dumps({
+                    "id": message.id, "payload": message.payload, "attempts": attempts,
+                    "error": error, "failed_at": time.time(),
+                }))
+            else:
+                delay = min(self.backoff_base * 2 ** message.attempts, self.backoff_max)
+                pipe.zadd(self.delayed_key, {self.encode(message.payload, attempts, message.id): time.time() + delay})
+            await pipe.execute()
+
+        if attempts >= self.max_attempts:
+            logger.error(f"Dead-lettered {self.name} item {message.id} after {attempts} attempts: {error}")
+        else:
+            logger.warning(f"Retrying {self.name} item {message.id} (attempt {attempts + 1}/{self.max_attempts}): {error}")
+
+    async def reap(self, limit: int = 100) -> dict:
+        """Re-add entries abandoned by dead consumers and release due retries. Safe to run from every worker."""
+        await self._ensure_group()
+        requeued = dead_lettered = 0
+        cursor, claimed, *_ = await self.redis.xautoclaim(
+            self.stream_key, self.group, self.consumer, int(self.visibility_timeout * 1000), self._claim_cursor, count=limit
+        )
+        self._claim_cursor = cursor or "0-0"
+        for entry_id, fields in claimed:
+            if entry_id is None:
+                # Redis 6.2 returns deleted entries as nil with no id to ack; 7.0+ drops them from the PEL itself
+                continue
+            if not fields:
+                # Trimmed by MAXLEN while pending; nothing left to deliver
+                await self.redis.xack(self.stream_key, self.group, entry_id)
+                continue
+            message = self._message(entry_id, fields)
+            attempts = message.attempts + 1
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.xack(self.stream_key, self.group, entry_id)
+                if attempts >= self.max_attempts:
+                    pipe.lpush(self.dead_key, json.dumps({
+                        "id": message.id, "payload": message.payload, "attempts": attempts,
+                        "error": "visibility timeout expired", "failed_at": time.time(),
+                    }))
+                    dead_lettered += 1
+                else:
+                    pipe.xadd(self.stream_key, self._fields(message.payload, attempts, message.id), maxlen=self.maxlen, approximate=True)
+                    requeued += 1
+                await pipe.execute()
+
+        released = 0
+        for raw in await self.redis.zrangebyscore(self.delayed_key, "-inf", time.time(), start=0, num=limit):
+            # Whoever removes it releases it, so concurrent reapers don't double-deliver
+            if await self.redis.zrem(self.delayed_key, raw):
+                message = self.decode(raw)
+                await self.redis.xadd(
+                    self.stream_key, self._fields(message.payload, message.attempts, message.id),
+                    maxlen=self.maxlen, approximate=True,
+                )
+                released += 1
+
+        if requeued or dead_lettered:
+            logger.warning(f"Reaped {self.name}: {requeued} requeued, {dead_lettered} dead-lettered after lease expiry")
+        await self.prune_consumers()
+        return {"requeued": requeued, "dead_lettered": dead_lettered, "released": released}
+
+    async def depth(self) -> dict:
+        await self._ensure_group()
+        group = next(g for g in await self.redis.xinfo_groups(self.stream_key) if g["name"] == self.group)
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zcard(self.delayed_key)
+            pipe.llen(self.dead_key)
+            pipe.xlen(self.stream_key)
+            delayed, dead, length = await pipe.execute()
+        return {
+            # Entries not yet delivered to any consumer (None on Redis < 7)
+            "ready": group.get("lag"),
+            "in_flight": group["pending"],
+            "delayed": delayed,
+            "dead": dead,
+            "stream_length": length,
+            "consumers": group["consumers"],
+        }
+
+    async def consumer_stats(self) -> List[dict]:
+        """
+        Per-consumer pending count, idle time and lag (age of the last entry it read when it read it):
+        who is holding how much work, who is falling behind and who has gone quiet.
+        """
+        await self._ensure_group()
+        lags = await self.redis.hgetall(self.lag_key)
+        return [
+            {
+                "consumer": c["name"],
+                "pending": c["pending"],
+                "idle_seconds": c["idle"] / 1000,
+                "lag_seconds": float(lags[c["name"]]) if c["name"] in lags else None,
+            }
+            for c in await self.redis.xinfo_consumers(self.stream_key, self.group)
+        ]
+
+    async def prune_consumers(self, max_idle: float = 3600.0) -> int:
+        """Drop consumers that hold nothing and have been idle for `max_idle` seconds (workers that went away)."""
+        removed = 0
+        for consumer in await self.consumer_stats():
+            if consumer["pending"] == 0 and consumer["idle_seconds"] > max_idle and consumer["consumer"] != self.consumer:
+                await self.redis.xgroup_delconsumer(self.stream_key, self.group, consumer["consumer"])
+                await self.redis.hdel(self.lag_key, consumer["consumer"])
+                removed += 1
+        return removed
@@ -0,0 +1,41 @@
+import logging
+import os
+from redis.asyncio import Redis
+from src.scout.cursor import SearchCursorStore
+from src.scout.dedup import SeenJobFilter
+from src.scout.publisher import JobPublisher
+
+logger = logging.getLogger(__name__)
+
+class BaseScout:
+    """Shared plumbing for scout backends: every backend hands job_data dicts to the same queue."""
+    # Set SCOUT_QUEUE=discovered_job_queue to route jobs through the description fetch stage first
+    QUEUE_NAME = "raw_job_queue"
+
+    def __init__(self):
+        self.redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+        self.seen_filter = SeenJobFilter(
+            self.redis,
+            mode=os.getenv("SCOUT_DEDUP_MODE", "set"),
+            ttl_seconds=int(os.getenv("SCOUT_DEDUP_TTL_SECONDS", 7 * 24 * 3600)),
+        )
+        self.cursors = SearchCursorStore(self.redis)
+        self.publisher = JobPublisher(
+            self.redis,
+            os.getenv("SCOUT_QUEUE", self.QUEUE_NAME),
+            seen_filter=self.seen_filter,
+            batch_size=int(os.getenv("SCOUT_PUBLISH_BATCH_SIZE", 50)),
+            flush_interval=float(os.getenv("SCOUT_PUBLISH_INTERVAL_SECONDS", 2.0)),
+        )
+
+    async def push_to_queue(self, job_data: dict):
+        """Buffers raw job data for the next batched push to the Redis queue."""
+        await self.publisher.add(job_data)
+
+    async def close(self):
+        try:
+            # Flush before the Redis client goes away so a cancelled scout loses nothing
+            await self.publisher.close()
+        finally:
+            logger.info(f"Dedup filter stats: {self.seen_filter.stats()}")
+            await self.redis.aclose()
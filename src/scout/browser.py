@@ -1,24 +1,65 @@
 import os
 import random
 import asyncio
-from typing import Optional
-from playwright.async_api import async_playwright, Browser, Page, BrowserContext
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+from urllib.parse import urlparse
 from fake_useragent import UserAgent
 
+if TYPE_CHECKING:
+    from playwright.async_api import Browser, BrowserContext, Page, Request, Route
+
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Lean profile defaults: resources discovery never reads
+LEAN_BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
+LEAN_BLOCKED_DOMAINS = {
+    "doubleclick.net",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "googlesyndication.com",
+    "ads.linkedin.com",
+    "px.ads.linkedin.com",
+    "snap.licdn.com",
+    "connect.facebook.net",
+    "bat.bing.com",
+    "hotjar.com",
+}
+LEAN_VIEWPORT = {"width": 1280, "height": 800}
+
 class BrowserSession:
-    def __init__(self, headless: bool = False, session_file: Optional[str] = None):
+    def __init__(
+        self,
+        headless: bool = False,
+        session_file: Optional[str] = None,
+        lean: bool = False,
+        viewport: Optional[Dict[str, int]] = None,
+        blocked_resource_types: Optional[Iterable[str]] = None,
+        blocked_domains: Optional[Iterable[str]] = None,
+    ):
+        """
+        `lean=True` is the opt-in discovery profile: requests are aborted by resource type and
+        domain blocklist, slow_mo is off and the viewport defaults to LEAN_VIEWPORT.
+        """
         self.headless = headless
         self.session_file = session_file
-        self.browser: Optional[Browser] = None
-        self.context: Optional[BrowserContext] = None
+        self.lean = lean
+        self.viewport = viewport or (LEAN_VIEWPORT if lean else {"width": 1920, "height": 1080})
+        self.blocked_resource_types = set(blocked_resource_types or (LEAN_BLOCKED_RESOURCE_TYPES if lean else ()))
+        self.blocked_domains = set(blocked_domains or (LEAN_BLOCKED_DOMAINS if lean else ()))
+        self.browser: Optional["Browser"] = None
+        self.context: Optional["BrowserContext"] = None
         self.playwright = None
         self.ua = UserAgent()
 
-    async def start(self):
+    async def launch(self):
+        """Start Playwright and the shared Chromium instance without opening a context."""
+        if self.browser:
+            return
+
+        from playwright.async_api import async_playwright
+
         self.playwright = await async_playwright().start()
         
         args = [
@@ -34,38 +75,88 @@ class BrowserSession:
             "--disable-dev-shm-usage",
         ]
 
-        self.browser = await self.playwright.chromium.launch(
-            headless=self.headless,
-            args=args,
-            slow_mo=random.randint(20, 100)  # Human-like typing/action speed
-        )
+        launch_args = {"headless": self.headless, "args": args}
+        if not self.lean:
+            launch_args["slow_mo"] = random.randint(20, 100)  # Human-like typing/action speed
+
+        self.browser = await self.playwright.chromium.launch(**launch_args)
+
+    async def new_context(self, load_session: bool = True) -> "BrowserContext":
+        """
+        Create a fresh BrowserContext on the shared browser.
+        Each context gets its own random fingerprint; the saved session is only loaded when requested.
+        """
+        if not self.browser:
+            await self.launch()
 
         # Create a context with random fingerprint or loaded state
         user_agent = self.ua.random
         
         context_args = {
             "user_agent": user_agent,
-            "viewport": {"width": 1920, "height": 1080},
+            "viewport": self.viewport,
             "ignore_https_errors": True,
             "java_script_enabled": True,
             "locale": "en-US",
             "timezone_id": "America/New_York",
         }
         
-        if self.session_file and os.path.exists(self.session_file):
+        if load_session and self.session_file and os.path.exists(self.session_file):
             logger.info(f"Loading browser session from {self.session_file}")
             context_args["storage_state"] = self.session_file
         
-        self.context = await self.browser.new_context(**context_args)
+        context = await self.browser.new_context(**context_args)
         
         # Anti-detect injections
-        await self.context.add_init_script("""
+        await context.add_init_script("""
             Object.defineProperty(navigator, 'webdriver', {
                 get: () => undefined
             });
         """)
 
-    async def get_page(self) -> Page:
+        if self.blocked_resource_types or self.blocked_domains:
+            await context.route("**/*", self._filter_request)
+        return context
+
+    def _is_blocked(self, request: "Request") -> bool:
+        if request.resource_type in self.blocked_resource_types:
+            return True
+        host = urlparse(request.url).hostname or ""
+        return any(host == domain or host.endswith(f".{domain}") for domain in self.blocked_domains)
+
+    async def _filter_request(self, route: "Route"):
+        if self._is_blocked(route.request):
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    def track_page(self, page: "Page") -> Dict[str, int]:
+        """
+        Count requests and transferred bytes for a page. Returns a dict that is updated in place;
+        aborted (blocked) requests show up under "failed".
+        """
+        metrics = {"requests": 0, "failed": 0, "bytes": 0}
+
+        async def on_finished(request: "Request"):
+            metrics["requests"] += 1
+            try:
+                sizes = await request.sizes()
+                metrics["bytes"] += sizes["responseBodySize"] + sizes["responseHeadersSize"]
+            except Exception:
+                pass
+
+        def on_failed(request: "Request"):
+            metrics["failed"] += 1
+
+        page.on("requestfinished", on_finished)
+        page.on("requestfailed", on_failed)
+        return metrics
+
+    async def start(self):
+        await self.launch()
+        self.context = await self.new_context()
+
+    async def get_page(self) -> "Page":
         if not self.context:
             await self.start()
         return await self.context.new_page()
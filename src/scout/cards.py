@@ -0,0 +1,54 @@
+from typing import List, Optional
+from bs4 import BeautifulSoup
+
+def parse_job_id(entity_urn: Optional[str], url: Optional[str]) -> Optional[str]:
+    """Extract the LinkedIn job id from the card URN (urn:li:jobPosting:<id>), falling back to the URL slug."""
+    if entity_urn:
+        return entity_urn.rsplit(":", 1)[-1]
+    if url:
+        return url.split("-")[-1]
+    return None
+
+def build_job_data(card: dict) -> dict:
+    """Normalize raw card fields into the job_data dict pushed to raw_job_queue."""
+    url = card.get("url")
+    if url:
+        url = url.split("?")[0]
+
+    return {
+        "platform": "linkedin",
+        "title": (card.get("title") or "").strip(),
+        "company": (card.get("company") or "").strip(),
+        "location": (card.get("location") or "").strip() or None,
+        "url": url,
+        "platform_job_id": parse_job_id(card.get("entity_urn"), url),
+        "posted_at": card.get("posted_at"),
+        "status": "DISCOVERED"
+    }
+
+def parse_cards_html(html: str) -> List[dict]:
+    """
+    Parse `.base-card` job cards out of a search results page or guest listing fragment.
+    Mirrors the fields the browser scout extracts in-page.
+    """
+    soup = BeautifulSoup(html, "html.parser")
+
+    def text(root, selector: str) -> Optional[str]:
+        el = root.select_one(selector)
+        return el.get_text(strip=True) if el else None
+
+    jobs = []
+    for card in soup.select(".base-card"):
+        link = card.select_one("a.base-card__full-link")
+        posted = card.select_one("time")
+        job_data = build_job_data({
+            "title": text(card, ".base-search-card__title"),
+            "company": text(card, ".base-search-card__subtitle"),
+            "location": text(card, ".job-search-card__location"),
+            "url": link.get("href") if link else None,
+            "entity_urn": card.get("data-entity-urn"),
+            "posted_at": posted.get("datetime") if posted else None,
+        })
+        if job_data["platform_job_id"]:
+            jobs.append(job_data)
+    return jobs
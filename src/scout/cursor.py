@@ -0,0 +1,86 @@
+import json
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+from redis.asyncio import Redis
+from src.scout.models import SearchQuery
+
+logger = logging.getLogger(__name__)
+
+class SearchCursor:
+    """
+    High-water mark for one saved search during a single run.
+
+    Results are requested newest-first, so the run has reached known territory as soon as it sees
+    the previous run's newest job id, or a few consecutive ids that are numerically not newer
+    (LinkedIn ids grow over time; the streak tolerates promoted postings sorted out of order).
+    """
+    KNOWN_STREAK = 3
+
+    def __init__(self, platform: str, search_key: str, previous: Optional[dict] = None):
+        self.platform = platform
+        self.search_key = search_key
+        self.previous_id: Optional[str] = previous.get("job_id") if previous else None
+        self.newest_id: Optional[str] = None
+        self.reached_known = False
+        self._streak = 0
+
+    def _is_newer(self, job_id: str, other: Optional[str]) -> bool:
+        if other is None:
+            return True
+        if job_id.isdigit() and other.isdigit():
+            return int(job_id) > int(other)
+        return job_id != other
+
+    @property
+    def advanced(self) -> bool:
+        """True if this run saw a job newer than the stored high-water mark."""
+        return self.newest_id is not None and self.newest_id != self.previous_id and self._is_newer(self.newest_id, self.previous_id)
+
+    def is_known(self, job_id: Optional[str]) -> bool:
+        """Record a job id from the results page. Returns True once the run has caught up with the last one."""
+        if not job_id:
+            return False
+
+        # Newest-first ordering: the first id is the newest unless a numerically larger one shows up later
+        if self.newest_id is None or (job_id.isdigit() and self.newest_id.isdigit() and int(job_id) > int(self.newest_id)):
+            self.newest_id = job_id
+
+        if self.previous_id is None:
+            return False
+        if job_id == self.previous_id:
+            self.reached_known = True
+        elif not self._is_newer(job_id, self.previous_id):
+            self._streak += 1
+            self.reached_known = self._streak >= self.KNOWN_STREAK
+        else:
+            self._streak = 0
+        return self.reached_known
+
+class SearchCursorStore:
+    """Per saved search cursors stored in one Redis hash per platform."""
+    def __init__(self, redis: Redis, key_prefix: str = "scout:cursor"):
+        self.redis = redis
+        self.key_prefix = key_prefix
+
+    async def open(self, platform: str, search: SearchQuery) -> SearchCursor:
+        raw = await self.redis.hget(f"{self.key_prefix}:{platform}", search.key)
+        previous = json.loads(raw) if raw else None
+        if previous:
+            logger.info(f"Resuming '{search.keywords}' in '{search.location}' from job {previous['job_id']} ({previous['seen_at']})")
+        return SearchCursor(platform, search.key, previous)
+
+    async def commit(self, cursor: SearchCursor, exhausted: bool = False):
+        """
+        Persist the newest job id seen in this run, if it moved the high-water mark. A run that stopped
+        (at its limit) before reaching the old mark and with pages left keeps the old one: the jobs in
+        between were never seen, and moving the mark past them would skip them for good.
+        """
+        if not cursor.advanced:
+            return
+        if cursor.previous_id is not None and not (cursor.reached_known or exhausted):
+            logger.info(f"Keeping the cursor for '{cursor.search_key}' at {cursor.previous_id}: stopped before reaching it")
+            return
+
+        value = json.dumps({"job_id": cursor.newest_id, "seen_at": datetime.now(timezone.utc).isoformat()})
+        await self.redis.hset(f"{self.key_prefix}:{cursor.platform}", cursor.search_key, value)
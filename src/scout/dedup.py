@@ -0,0 +1,179 @@
+import hashlib
+import logging
+import math
+import time
+from typing import List, Tuple
+from redis.asyncio import Redis
+
+logger = logging.getLogger(__name__)
+
+class SeenJobFilter:
+    """
+    Seen-job filter keyed on (platform, platform_job_id), checked by the scout before enqueueing.
+
+    Modes:
+    - "set":   exact. One sorted set per platform scored by last-seen time; entries older than
+               `ttl_seconds` are pruned, so a job seen again after the TTL is treated as new.
+    - "bloom": approximate, fixed memory for very large histories. A Redis bitmap Bloom filter
+               (no RedisBloom module needed) sized from `bloom_capacity` and `bloom_error_rate`.
+               False positives drop a new job with probability ~error_rate; the whole filter
+               expires `ttl_seconds` after it was created.
+    - "none":  disabled, every job is treated as new.
+    """
+    MODES = ("set", "bloom", "none")
+
+    def __init__(
+        self,
+        redis: Redis,
+        mode: str = "set",
+        ttl_seconds: int = 7 * 24 * 3600,
+        bloom_capacity: int = 1_000_000,
+        bloom_error_rate: float = 0.001,
+        key_prefix: str = "seen_jobs",
+    ):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedup mode '{mode}', expected one of {self.MODES}")
+
+        self.redis = redis
+        self.mode = mode
+        self.ttl_seconds = ttl_seconds
+        self.key_prefix = key_prefix
+        self.hits = 0
+        self.misses = 0
+
+        # Optimal Bloom parameters: m = -n ln p / (ln 2)^2, k = (m / n) ln 2
+        self.bloom_bits = int(math.ceil(-bloom_capacity * math.log(bloom_error_rate) / (math.log(2) ** 2)))
+        self.bloom_hashes = max(1, round(self.bloom_bits / bloom_capacity * math.log(2)))
+
+    def _key(self, platform: str) -> str:
+        return f"{self.key_prefix}:{platform}" if self.mode == "set" else f"{self.key_prefix}:{platform}:bloom"
+
+    def _bloom_offsets(self, job_id: str) -> list[int]:
+        # Double hashing: h_i = h1 + i * h2 (Kirsch-Mitzenmacher)
+        digest = hashlib.sha256(job_id.encode()).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:16], "big") | 1
+        return [(h1 + i * h2) % self.bloom_bits for i in range(self.bloom_hashes)]
+
+    async def check_and_add(self, platform: str, platform_job_id: str) -> bool:
+        """Atomically record the job as seen. Returns True if it had already been seen."""
+        return (await self.check_and_add_many([(platform, platform_job_id)]))[0]
+
+    async def check_and_add_many(self, jobs: List[Tuple[str, str]]) -> List[bool]:
+        """
+        Record a batch of (platform, platform_job_id) pairs as seen in one pipelined round trip.
+        Returns, per pair, True if it had already been seen (including earlier in the same batch).
+        """
+        if self.mode == "none":
+            self.misses += len(jobs)
+            return [False] * len(jobs)
+
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for platform, platform_job_id in jobs:
+                if not platform_job_id:
+                    continue
+                key = self._key(platform)
+                if self.mode == "set":
+                    pipe.zremrangebyscore(key, "-inf", now - self.ttl_seconds)
+                    # ZADD returns 1 only for new members; existing members just get their timestamp refreshed
+                    pipe.zadd(key, {platform_job_id: now})
+                    pipe.expire(key, self.ttl_seconds)
+                else:
+                    for offset in self._bloom_offsets(platform_job_id):
+                        pipe.setbit(key, offset, 1)
+                    pipe.expire(key, self.ttl_seconds, nx=True)
+            results = await pipe.execute() if len(pipe) else []
+
+        seen_flags = []
+        cursor = 0
+        for _, platform_job_id in jobs:
+            if not platform_job_id:
+                seen_flags.append(False)
+                continue
+            if self.mode == "set":
+                _, added, _ = results[cursor:cursor + 3]
+                cursor += 3
+                seen_flags.append(added == 0)
+            else:
+                bits = results[cursor:cursor + self.bloom_hashes]
+                cursor += self.bloom_hashes + 1
+                seen_flags.append(all(bits))
+
+        hits = sum(seen_flags)
+        self.hits += hits
+        self.misses += len(seen_flags) - hits
+        return seen_flags
+
+    async def check_many(self, jobs: List[Tuple[str, str]]) -> List[bool]:
+        """
+        Like check_and_add_many but read-only, so a caller can mark jobs with add_many() only once
+        they are safely published. Returns, per pair, True if it was seen before or earlier in the batch.
+        """
+        if self.mode == "none":
+            self.misses += len(jobs)
+            return [False] * len(jobs)
+
+        now = time.time()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for platform, platform_job_id in jobs:
+                if not platform_job_id:
+                    continue
+                if self.mode == "set":
+                    pipe.zscore(self._key(platform), platform_job_id)
+                else:
+                    for offset in self._bloom_offsets(platform_job_id):
+                        pipe.getbit(self._key(platform), offset)
+            results = await pipe.execute() if len(pipe) else []
+
+        seen_flags = []
+        in_batch = set()
+        cursor = 0
+        for platform, platform_job_id in jobs:
+            if not platform_job_id:
+                seen_flags.append(False)
+                continue
+            if self.mode == "set":
+                score = results[cursor]
+                cursor += 1
+                seen = score is not None and score >= now - self.ttl_seconds
+            else:
+                seen = all(results[cursor:cursor + self.bloom_hashes])
+                cursor += self.bloom_hashes
+            seen_flags.append(seen or (platform, platform_job_id) in in_batch)
+            in_batch.add((platform, platform_job_id))
+
+        hits = sum(seen_flags)
+        self.hits += hits
+        self.misses += len(seen_flags) - hits
+        return seen_flags
+
+    async def add_many(self, jobs: List[Tuple[str, str]]):
+        """Record (platform, platform_job_id) pairs as seen, in one pipelined round trip."""
+        if self.mode == "none":
+            return
+        now = time.time()
+        async with self.redis.pipeline(transaction=True) as pipe:
+            for platform, platform_job_id in jobs:
+                if not platform_job_id:
+                    continue
+                key = self._key(platform)
+                if self.mode == "set":
+                    pipe.zremrangebyscore(key, "-inf", now - self.ttl_seconds)
+                    pipe.zadd(key, {platform_job_id: now})
+                    pipe.expire(key, self.ttl_seconds)
+                else:
+                    for offset in self._bloom_offsets(platform_job_id):
+                        pipe.setbit(key, offset, 1)
+                    pipe.expire(key, self.ttl_seconds, nx=True)
+            if len(pipe):
+                await pipe.execute()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "mode": self.mode,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,193 @@
+import asyncio
+import json
+import logging
+import os
+import signal
+import time
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+import httpx
+from bs4 import BeautifulSoup
+from dotenv import load_dotenv
+from fake_useragent import UserAgent
+from redis.asyncio import Redis
+from src.intelligence.embeddings import JobRanker
+from src.intelligence.preprocess import HTML_PARSER, html_to_text
+from src.intelligence.profile import load_user_profile
+from src.queues.backpressure import BackpressureGate
+from src.queues.factory import get_queue
+from src.queues.reliable import Message
+from src.scout.publisher import JobPublisher
+
+load_dotenv()
+logger = logging.getLogger(__name__)
+
+DESCRIPTION_SELECTORS = (
+    ".show-more-less-html__markup",
+    ".description__text",
+    ".jobs-description__content",
+)
+
+class HostRateLimiter:
+    """Per-host concurrency cap plus a minimum interval between request starts to the same host."""
+    def __init__(self, max_concurrency: int = 4, min_interval: float = 1.0):
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self._semaphores: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(self.max_concurrency))
+        self._locks: Dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._next_start: Dict[str, float] = defaultdict(float)
+
+    async def acquire(self, host: str):
+        await self._semaphores[host].acquire()
+        async with self._locks[host]:
+            delay = self._next_start[host] - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_start[host] = time.monotonic() + self.min_interval
+
+    def release(self, host: str):
+        self._semaphores[host].release()
+
+def parse_description(html: str) -> Tuple[Optional[str], Optional[str]]:
+    """Return (description_html, description_text) from a job posting page, or (None, None)."""
+    soup = BeautifulSoup(html, HTML_PARSER)
+    for selector in DESCRIPTION_SELECTORS:
+        el = soup.select_one(selector)
+        if el:
+            description_html = el.decode_contents().strip()
+            return description_html, html_to_text(description_html)
+    return None, None
+
+class DescriptionFetcher:
+    """
+    Pipeline stage between the scout and the intelligence worker.
+
+    Reads discovered jobs from `discovered_job_queue`, fetches their detail pages concurrently over
+    a pooled HTTP client (rate limited per host), fills description_html/description_text and
+    forwards them to `raw_job_queue`. Point the scout at this stage with SCOUT_QUEUE=discovered_job_queue.
+    """
+    INPUT_QUEUE = "discovered_job_queue"
+    OUTPUT_QUEUE = "raw_job_queue"
+    # Guest endpoint that serves the posting HTML without a login wall
+    POSTING_URL = "https://www.linkedin.com/jobs-guest/jobs/api/jobPosting/{job_id}"
+
+    def __init__(self, concurrency: int = 16, per_host_concurrency: int = 4, per_host_interval: float = 1.0):
+        self.redis = Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379/0"), decode_responses=True)
+        self.input_queue = get_queue(self.redis, self.INPUT_QUEUE)
+        self.concurrency = concurrency
+        self.limiter = HostRateLimiter(per_host_concurrency, per_host_interval)
+        self.client = httpx.AsyncClient(
+            timeout=20.0,
+            limits=httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency),
+            headers={"User-Agent": UserAgent().random, "Accept-Language": "en-US,en;q=0.9"},
+            follow_redirects=True,
+        )
+        # Throttle by not popping rather than in the publisher, so leased items aren't held while paused
+        self.publisher = JobPublisher(self.redis, self.OUTPUT_QUEUE, batch_size=20, flush_interval=1.0, throttle=False)
+        self.output_gate = BackpressureGate.from_env(self.publisher.queue)
+        # Scores jobs against the profile so raw_job_queue hands the best matches to the worker first
+        self.ranker = JobRanker()
+        self.user_profile = load_user_profile()
+        self._stopping = asyncio.Event()
+
+    def request_shutdown(self):
+        """Stop taking new jobs; in-flight fetches finish and the publisher flushes before run() returns."""
+        if not self._stopping.is_set():
+            logger.info("Shutdown requested. Draining in-flight fetches...")
+            self._stopping.set()
+
+    def _detail_url(self, job_data: dict) -> Optional[str]:
+        if job_data.get("platform") == "linkedin" and job_data.get("platform_job_id"):
+            return self.POSTING_URL.format(job_id=job_data["platform_job_id"])
+        return job_data.get("url")
+
+    async def fetch_description(self, job_data: dict) -> dict:
+        """Fill description fields in place. Jobs whose page can't be fetched are passed through unchanged."""
+        if job_data.get("description_text"):
+            return job_data
+
+        url = self._detail_url(job_data)
+        if not url:
+            return job_data
+
+        host = urlparse(url).hostname or ""
+        await self.limiter.acquire(host)
+        try:
+            response = await self.client.get(url)
+            response.raise_for_status()
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to fetch description for {job_data.get('platform_job_id')}: {e}")
+            return job_data
+        finally:
+            self.limiter.release(host)
+
+        description_html, description_text = parse_description(response.text)
+        if description_text:
+            job_data["description_html"] = description_html
+            job_data["description_text"] = description_text
+        else:
+            logger.warning(f"No description found on {url}")
+        return job_data
+
+    async def _handle(self, message: Message, semaphore: asyncio.Semaphore):
+        try:
+            try:
+                job_data = await self.fetch_description(json.loads(message.payload))
+            except Exception as e:
+                logger.error(f"Failed to fetch job description: {e}", exc_info=True)
+                await self.input_queue.nack(message, repr(e))
+                return
+            try:
+                await self.ranker.score_job_data([job_data], self.user_profile)
+            except Exception as e:
+                # Unscored jobs are still queued, ranked by skill overlap instead
+                logger.warning(f"Failed to embed job {job_data.get('platform_job_id')}: {e}")
+            # Ack only once the batch holding this job is pushed. A failed flush keeps the job buffered
+            # for the next one; if the process dies first, the lease expires and the job is redelivered
+            try:
+                await self.publisher.add(job_data, on_published=lambda: self.input_queue.ack(message))
+            except Exception as e:
+                logger.error(f"Failed to publish to {self.OUTPUT_QUEUE}, will retry on the next flush: {e}")
+        finally:
+            semaphore.release()
+
+    async def run(self):
+        logger.info(f"Description fetcher started. Listening on {self.INPUT_QUEUE}...")
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self.request_shutdown)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        tasks = set()
+        reaper = asyncio.create_task(self.input_queue.run_reaper(self._stopping))
+        try:
+            while not self._stopping.is_set():
+                await semaphore.acquire()
+                # A stall on raw_job_queue can last minutes; shutdown mustn't wait for it to drain
+                await self.output_gate.wait(self._stopping)
+                if self._stopping.is_set():
+                    semaphore.release()
+                    break
+
+                message = await self.input_queue.pop(timeout=5)
+                if not message:
+                    semaphore.release()
+                    continue
+
+                task = asyncio.create_task(self._handle(message, semaphore))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            self._stopping.set()
+            await reaper
+            await self.publisher.close()
+            await self.client.aclose()
+            await self.redis.aclose()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    fetcher = DescriptionFetcher(concurrency=int(os.getenv("FETCHER_CONCURRENCY", 16)))
+    asyncio.run(fetcher.run())
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+import random
+from typing import AsyncGenerator, List, Optional, Set
+import httpx
+from fake_useragent import UserAgent
+from src.scout.base import BaseScout
+from src.scout.cards import parse_cards_html
+from src.scout.models import SearchQuery
+
+logger = logging.getLogger(__name__)
+
+class LinkedInGuestScout(BaseScout):
+    """
+    Browserless scout backend. Fetches the public guest job-search listing HTML over a pooled
+    HTTP client and parses it with BeautifulSoup into the same job_data dicts as LinkedInScout.
+
+    Point `base_url` (or LINKEDIN_GUEST_URL) at a local server, or pass an httpx `transport`
+    (e.g. httpx.MockTransport), to run it against fixtures offline.
+    """
+    BASE_URL = "https://www.linkedin.com"
+    SEARCH_PATH = "/jobs-guest/jobs/api/seeMoreJobPostings/search"
+    # The endpoint pages by a fixed offset, however many of a page's cards parse
+    PAGE_SIZE = 25
+
+    def __init__(
+        self,
+        base_url: Optional[str] = None,
+        max_connections: int = 10,
+        timeout: float = 15.0,
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        super().__init__()
+        self.base_url = base_url or os.getenv("LINKEDIN_GUEST_URL", self.BASE_URL)
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.max_connections = max_connections
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=timeout,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            headers={"User-Agent": UserAgent().random, "Accept-Language": "en-US,en;q=0.9"},
+            follow_redirects=True,
+            transport=transport,
+        )
+
+    async def close(self):
+        await self.client.aclose()
+        await super().close()
+
+    async def _fetch_page(self, search: SearchQuery, start: int) -> str:
+        params = {"keywords": search.keywords, "location": search.location, "start": start}
+        if search.incremental:
+            params["sortBy"] = "DD"
+        for attempt in range(self.max_retries + 1):
+            response = await self.client.get(self.SEARCH_PATH, params=params)
+            if response.status_code == 429 and attempt < self.max_retries:
+                delay = self.retry_base_delay * (2 ** attempt + random.uniform(0, 1))
+                logger.warning(f"Rate limited by guest endpoint, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            response.raise_for_status()
+            return response.text
+
+    async def search_jobs(self, keywords: str, location: str, limit: int = 10) -> AsyncGenerator[dict, None]:
+        async for job_data in self._scrape_results(SearchQuery(keywords=keywords, location=location, limit=limit)):
+            yield job_data
+
+    async def search_many(self, searches: List[SearchQuery]) -> List[dict]:
+        """Run several searches concurrently over the shared connection pool."""
+        semaphore = asyncio.Semaphore(self.max_connections)
+
+        async def run_search(search: SearchQuery) -> List[dict]:
+            async with semaphore:
+                return [job_data async for job_data in self._scrape_results(search)]
+
+        results = await asyncio.gather(*(run_search(search) for search in searches), return_exceptions=True)
+
+        jobs = []
+        for search, result in zip(searches, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Search '{search.keywords}' in '{search.location}' failed: {result}")
+                continue
+            logger.info(f"Search '{search.keywords}' in '{search.location}' found {len(result)} jobs")
+            jobs.extend(result)
+        return jobs
+
+    async def _scrape_results(self, search: SearchQuery) -> AsyncGenerator[dict, None]:
+        """Page through guest listing fragments for one search and push each job to the queue."""
+        seen_ids: Set[str] = set()
+        jobs_processed = 0
+        start = 0
+        failed = False
+        exhausted = False
+        cursor = await self.cursors.open("linkedin", search) if search.incremental else None
+
+        while jobs_processed < search.limit:
+            try:
+                html = await self._fetch_page(search, start)
+            except httpx.HTTPError as e:
+                logger.error(f"Guest search request failed: {e}")
+                failed = True
+                break
+
+            cards = parse_cards_html(html)
+            if not cards:
+                if start == 0:
+                    logger.warning("No job cards found. Maybe blocked or no results.")
+                exhausted = True
+                break
+            start += self.PAGE_SIZE
+
+            for job_data in cards:
+                if jobs_processed >= search.limit:
+                    break
+                if job_data["platform_job_id"] in seen_ids:
+                    continue
+                seen_ids.add(job_data["platform_job_id"])
+                if cursor and cursor.is_known(job_data["platform_job_id"]):
+                    break
+
+                yield job_data
+                await self.push_to_queue(job_data)
+                jobs_processed += 1
+
+            if cursor and cursor.reached_known:
+                logger.info(f"Reached previously seen results after {jobs_processed} new jobs")
+                break
+
+        # A failed run keeps the old mark so the next run re-covers the listings it missed
+        if cursor and not failed:
+            await self.cursors.commit(cursor, exhausted)
+
+if __name__ == "__main__":
+    # Test run
+    async def main():
+        scout = LinkedInGuestScout()
+        try:
+            async for job in scout.search_jobs("Software Engineer", "San Francisco", limit=5):
+                print(f"Found and queued: {job['title']}")
+        finally:
+            await scout.close()
+
+    asyncio.run(main())
@@ -1,102 +1,207 @@
 import asyncio
 import random
 import logging
-import json
-from typing import List, AsyncGenerator
-from bs4 import BeautifulSoup
-from redis.asyncio import Redis
+import os
+from typing import List, AsyncGenerator, Optional, Set
+from urllib.parse import urlencode
+from playwright.async_api import Page
+from src.scout.base import BaseScout
 from src.scout.browser import BrowserSession
+from src.scout.cards import build_job_data
+from src.scout.models import SearchQuery
+from src.scout.pool import ContextPool
 
 logger = logging.getLogger(__name__)
 
-class LinkedInScout:
+CARD_SELECTOR = "li .base-card"
+
+# Stop paginating after this many consecutive scrolls that surface no unseen cards
+MAX_EMPTY_BATCHES = 2
+
+# Returns every card not returned before and tags it, so each scroll batch only pays for new cards
+EXTRACT_CARDS_JS = """
+(selector) => {
+    const text = (root, sel) => {
+        const el = root.querySelector(sel);
+        return el ? el.innerText.trim() : null;
+    };
+    const cards = Array.from(document.querySelectorAll(selector))
+        .filter(card => !card.hasAttribute("data-aajas-seen"));
+    return cards.map(card => {
+        card.setAttribute("data-aajas-seen", "1");
+        const link = card.querySelector("a.base-card__full-link");
+        const posted = card.querySelector("time");
+        return {
+            title: text(card, ".base-search-card__title"),
+            company: text(card, ".base-search-card__subtitle"),
+            location: text(card, ".job-search-card__location"),
+            url: link ? link.getAttribute("href") : null,
+            entity_urn: card.getAttribute("data-entity-urn"),
+            posted_at: posted ? posted.getAttribute("datetime") : null,
+        };
+    });
+}
+"""
+
+SCROLL_NEXT_BATCH_JS = """
+() => {
+    window.scrollTo(0, document.body.scrollHeight);
+    const more = document.querySelector("button.infinite-scroller__show-more-button");
+    if (more && more.offsetParent !== null) more.click();
+}
+"""
+
+class LinkedInScout(BaseScout):
     BASE_URL = "https://www.linkedin.com/jobs/search"
 
-    def __init__(self):
-        self.browser_session = BrowserSession(headless=False)
-        # In prod, get redis URL from env
-        self.redis = Redis(host='localhost', port=6379, decode_responses=True)
+    def __init__(self, headless: bool = False, lean: Optional[bool] = None):
+        super().__init__()
+        if lean is None:
+            lean = os.getenv("SCOUT_LEAN_BROWSER", "0") == "1"
+        self.browser_session = BrowserSession(headless=headless, lean=lean)
 
-    async def push_to_queue(self, job_data: dict):
-        """Pushes raw job data to Redis queue for processing."""
-        # Check for duplicates (optional, can be done by a dedup filter later)
-        # pushing to 'raw_job_queue'
-        await self.redis.lpush("raw_job_queue", json.dumps(job_data))
-        logger.info(f"Pushed job {job_data.get('platform_job_id')} to queue")
+    async def close(self):
+        """Shut down the shared browser and the Redis client."""
+        await self.browser_session.close()
+        await super().close()
 
     async def search_jobs(self, keywords: str, location: str, limit: int = 10) -> AsyncGenerator[dict, None]:
+        """One-shot search on the scout's own page. Closes the browser and Redis client when done."""
         page = await self.browser_session.get_page()
-        
+
+        try:
+            async for job_data in self._scrape_results(page, SearchQuery(keywords=keywords, location=location, limit=limit)):
+                yield job_data
+        finally:
+            await self.close()
+
+    async def search_many(
+        self,
+        searches: List[SearchQuery],
+        max_contexts: int = 4,
+        pages_per_context: int = 1,
+        max_uses_per_context: int = 20,
+    ) -> List[dict]:
+        """
+        Run several searches concurrently over a bounded pool of contexts on one shared browser.
+        A failing search does not abort the others. Everything is shut down once at the end.
+        """
+        await self.browser_session.launch()
+        pool = ContextPool(
+            self.browser_session,
+            max_contexts=max_contexts,
+            pages_per_context=pages_per_context,
+            max_uses=max_uses_per_context,
+        )
+
+        async def run_search(search: SearchQuery) -> List[dict]:
+            async with pool.page() as page:
+                return [job_data async for job_data in self._scrape_results(page, search)]
+
+        try:
+            results = await asyncio.gather(*(run_search(search) for search in searches), return_exceptions=True)
+        finally:
+            await pool.close()
+            await self.close()
+
+        jobs = []
+        for search, result in zip(searches, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Search '{search.keywords}' in '{search.location}' failed: {result}")
+                continue
+            logger.info(f"Search '{search.keywords}' in '{search.location}' found {len(result)} jobs")
+            jobs.extend(result)
+        return jobs
+
+    async def _scrape_results(self, page: Page, search: SearchQuery) -> AsyncGenerator[dict, None]:
+        """Scrape job cards for one search on the given page and push each one to the queue."""
+        metrics = self.browser_session.track_page(page)
         try:
-            url = f"{self.BASE_URL}?keywords={keywords}&location={location}"
+            params = {"keywords": search.keywords, "location": search.location}
+            cursor = None
+            if search.incremental:
+                # Newest first, so the run can stop at the previous high-water mark
+                params["sortBy"] = "DD"
+                cursor = await self.cursors.open("linkedin", search)
+            url = f"{self.BASE_URL}?{urlencode(params)}"
             logger.info(f"Navigating to {url}")
             await page.goto(url, wait_until="domcontentloaded")
-            
+
             await asyncio.sleep(random.uniform(2, 5))
-            
+
             jobs_processed = 0
-            while jobs_processed < limit:
-                # Selectors on LinkedIn change, using generic classes where possible
-                job_cards = await page.locator("li .base-card").all()
-                
-                if not job_cards:
+            seen_ids: Set[str] = set()
+            empty_batches = 0
+            exhausted = False
+            while jobs_processed < search.limit:
+                # One in-page evaluation per scroll batch; cards already returned are tagged in the DOM
+                cards = await page.evaluate(EXTRACT_CARDS_JS, CARD_SELECTOR)
+
+                if not cards and not seen_ids:
                     logger.warning("No job cards found. Maybe blocked or no results.")
+                    exhausted = True
                     break
 
-                for card in job_cards:
-                    if jobs_processed >= limit:
-                        break
-                    
-                    try:
-                        await card.scroll_into_view_if_needed()
-                        await asyncio.sleep(random.uniform(0.5, 1.5))
-                        
-                        title_el = card.locator(".base-search-card__title")
-                        company_el = card.locator(".base-search-card__subtitle")
-                        link_el = card.locator("a.base-card__full-link")
-                        
-                        title = await title_el.inner_text()
-                        company = await company_el.inner_text()
-                        url = await link_el.get_attribute("href")
-                        
-                        if url:
-                            url = url.split("?")[0]
-
-                        job_data = {
-                            "platform": "linkedin",
-                            "title": title.strip(),
-                            "company": company.strip(),
-                            "url": url,
-                            "platform_job_id": url.split("-")[-1] if url else None,
-                            "status": "DISCOVERED"
-                        }
-                        
-                        # Yield back to caller
-                        yield job_data
-                        
-                        # Push to Redis for the Intelligence Engine
-                        await self.push_to_queue(job_data)
-                        
-                        jobs_processed += 1
-                        
-                    except Exception as e:
-                        logger.error(f"Error extracting card: {e}")
+                new_jobs = []
+                for card in cards:
+                    job_data = build_job_data(card)
+                    job_id = job_data["platform_job_id"]
+                    if not job_id or job_id in seen_ids:
                         continue
-                
-                await page.evaluate("window.scrollTo(0, document.body.scrollHeight)")
-                await asyncio.sleep(2)
-                
+                    seen_ids.add(job_id)
+                    new_jobs.append(job_data)
+
+                if not new_jobs:
+                    empty_batches += 1
+                    if empty_batches >= MAX_EMPTY_BATCHES:
+                        logger.info(f"No new cards after {empty_batches} scrolls, stopping at {jobs_processed} jobs")
+                        exhausted = True
+                        break
+                else:
+                    empty_batches = 0
+
+                for job_data in new_jobs[:search.limit - jobs_processed]:
+                    if cursor and cursor.is_known(job_data["platform_job_id"]):
+                        break
+
+                    # Yield back to caller
+                    yield job_data
+
+                    # Push to Redis for the Intelligence Engine
+                    await self.push_to_queue(job_data)
+
+                    jobs_processed += 1
+
+                if jobs_processed >= search.limit:
+                    break
+                if cursor and cursor.reached_known:
+                    logger.info(f"Reached previously seen results after {jobs_processed} new jobs")
+                    break
+
+                # Load the next batch: scroll to the bottom and click "See more jobs" if it is shown
+                await page.evaluate(SCROLL_NEXT_BATCH_JS)
+                await asyncio.sleep(random.uniform(1.5, 3))
+
+            if cursor:
+                await self.cursors.commit(cursor, exhausted)
+
         except Exception as e:
             logger.error(f"Search failed: {e}")
         finally:
-            await self.browser_session.close()
-            await self.redis.aclose()
+            logger.info(
+                f"Search page transferred {metrics['bytes'] / 1024:.0f} KB over {metrics['requests']} requests "
+                f"({metrics['failed']} failed or blocked)"
+            )
 
 if __name__ == "__main__":
     # Test run
     async def main():
         scout = LinkedInScout()
-        async for job in scout.search_jobs("Software Engineer", "San Francisco", limit=2):
+        jobs = await scout.search_many([
+            SearchQuery(keywords="Software Engineer", location="San Francisco", limit=2),
+            SearchQuery(keywords="Backend Engineer", location="New York", limit=2),
+        ], max_contexts=2)
+        for job in jobs:
             print(f"Found and queued: {job['title']}")
 
     asyncio.run(main())
@@ -0,0 +1,12 @@
+from pydantic import BaseModel, Field
+
+class SearchQuery(BaseModel):
+    keywords: str = Field(description="Search keywords, e.g. 'Software Engineer'")
+    location: str = Field(description="Location filter, e.g. 'San Francisco'")
+    limit: int = Field(default=10, description="Maximum number of jobs to collect for this search")
+    incremental: bool = Field(default=True, description="Sort newest-first and stop at the previous run's high-water mark")
+
+    @property
+    def key(self) -> str:
+        """Stable identifier for this saved search."""
+        return f"{self.keywords.strip().lower()}|{self.location.strip().lower()}"
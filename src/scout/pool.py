@@ -0,0 +1,90 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import AsyncIterator, List
+from playwright.async_api import BrowserContext, Page
+from src.scout.browser import BrowserSession
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class _PooledContext:
+    context: BrowserContext
+    active: int = 0
+    uses: int = 0
+    retired: bool = False
+
+class ContextPool:
+    """
+    Bounded pool of BrowserContexts carved out of one shared BrowserSession.
+
+    At most `max_contexts * pages_per_context` pages are open at once. A context is
+    recycled (closed and replaced with a fresh fingerprint) after `max_uses` pages.
+    """
+    def __init__(
+        self,
+        session: BrowserSession,
+        max_contexts: int = 4,
+        pages_per_context: int = 1,
+        max_uses: int = 20,
+    ):
+        self.session = session
+        self.max_contexts = max_contexts
+        self.pages_per_context = pages_per_context
+        self.max_uses = max_uses
+        self._contexts: List[_PooledContext] = []
+        self._slots = asyncio.Semaphore(max_contexts * pages_per_context)
+        self._lock = asyncio.Lock()
+
+    async def _checkout(self) -> _PooledContext:
+        async with self._lock:
+            for pooled in self._contexts:
+                if pooled.active < self.pages_per_context:
+                    break
+            else:
+                # The slot semaphore guarantees there is room for a new context here
+                pooled = _PooledContext(context=await self.session.new_context(load_session=False))
+                self._contexts.append(pooled)
+                logger.debug(f"Opened pooled context ({len(self._contexts)}/{self.max_contexts})")
+
+            pooled.active += 1
+            pooled.uses += 1
+            if pooled.uses >= self.max_uses:
+                # Stop handing out this context; it is closed once its last page is released
+                pooled.retired = True
+                self._contexts.remove(pooled)
+            return pooled
+
+    async def _checkin(self, pooled: _PooledContext):
+        async with self._lock:
+            pooled.active -= 1
+            if pooled.retired and pooled.active == 0:
+                await pooled.context.close()
+                logger.debug("Recycled pooled context")
+
+    @asynccontextmanager
+    async def page(self) -> AsyncIterator[Page]:
+        """Borrow a page from the pool. The page is closed when the block exits."""
+        async with self._slots:
+            pooled = await self._checkout()
+            page = None
+            try:
+                page = await pooled.context.new_page()
+                yield page
+            finally:
+                if page:
+                    try:
+                        await page.close()
+                    except Exception as e:
+                        logger.warning(f"Error closing pooled page: {e}")
+                await self._checkin(pooled)
+
+    async def close(self):
+        async with self._lock:
+            for pooled in self._contexts:
+                try:
+                    await pooled.context.close()
+                except Exception as e:
+                    logger.error(f"Error closing pooled context: {e}")
+            self._contexts.clear()
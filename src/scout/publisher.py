@@ -0,0 +1,130 @@
+import asyncio
+import json
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple
+from redis.asyncio import Redis
+from src.queues.backpressure import BackpressureGate
+from src.queues.factory import get_queue
+from src.queues.priority import priority_skills, raw_job_priority
+from src.scout.dedup import SeenJobFilter
+
+logger = logging.getLogger(__name__)
+
+OnPublished = Callable[[], Awaitable[None]]
+
+class JobPublisher:
+    """
+    Buffers scouted jobs and publishes them to the queue in pipelined batches.
+
+    A batch is flushed when it reaches `batch_size`, when `flush_interval` seconds have passed
+    since the last flush, and on close(). Each flush costs one pipelined dedup round trip plus
+    one pipelined push, instead of two round trips per job. With `throttle`, flushes wait while
+    the queue is over its high watermark, which in turn blocks add() once the buffer is full.
+    """
+    def __init__(
+        self,
+        redis: Redis,
+        queue_name: str,
+        seen_filter: Optional[SeenJobFilter] = None,
+        batch_size: int = 50,
+        flush_interval: float = 2.0,
+        throttle: bool = True,
+    ):
+        self.redis = redis
+        self.queue_name = queue_name
+        self.queue = get_queue(redis, queue_name)
+        self.gate = BackpressureGate.from_env(self.queue) if throttle else None
+        self.skills = priority_skills()
+        self.seen_filter = seen_filter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.published = 0
+        self._buffer: List[Tuple[dict, Optional[OnPublished]]] = []
+        self._lock = asyncio.Lock()
+        self._timer: Optional[asyncio.Task] = None
+
+    async def add(self, job_data: dict, on_published: Optional[OnPublished] = None):
+        """
+        Buffer a job for the next flush. `on_published` is awaited once the job is safely in the queue
+        (or skipped as a duplicate), e.g. to ack the message it came from; it never runs if the push fails.
+        """
+        self._buffer.append((job_data, on_published))
+        if self._timer is None:
+            self._timer = asyncio.create_task(self._flush_periodically())
+        if len(self._buffer) >= self.batch_size:
+            await self.flush()
+
+    async def _flush_periodically(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Periodic flush to {self.queue_name} failed: {e}")
+
+    async def flush(self, throttle: bool = True) -> int:
+        """Publish everything buffered so far. Returns the number of jobs pushed."""
+        async with self._lock:
+            if not self._buffer:
+                return 0
+            if throttle and self.gate:
+                await self.gate.wait()
+            entries, self._buffer = self._buffer, []
+            batch = [job for job, _ in entries]
+
+            try:
+                # Jobs are only marked seen once pushed; marking first would make a failed push's retry
+                # drop the whole batch as duplicates. A crash in between at worst re-sends a few jobs,
+                # which the intelligence worker skips by platform_job_id
+                if self.seen_filter:
+                    seen = await self.seen_filter.check_many(
+                        [(job.get("platform"), job.get("platform_job_id")) for job in batch]
+                    )
+                    fresh = [job for job, was_seen in zip(batch, seen) if not was_seen]
+                else:
+                    fresh = batch
+
+                if fresh:
+                    async with self.redis.pipeline(transaction=False) as pipe:
+                        for start in range(0, len(fresh), self.batch_size):
+                            chunk = fresh[start:start + self.batch_size]
+                            await self.queue.push_many(
+                                (json.dumps(job) for job in chunk),
+                                pipeline=pipe,
+                                priorities=[raw_job_priority(job, self.skills) for job in chunk],
+                            )
+                        await pipe.execute()
+                    if self.seen_filter:
+                        await self.seen_filter.add_many(
+                            [(job.get("platform"), job.get("platform_job_id")) for job in fresh]
+                        )
+            except Exception:
+                # Keep the batch so the next flush (or close) retries it
+                self._buffer = entries + self._buffer
+                raise
+
+            for job, on_published in entries:
+                if on_published:
+                    try:
+                        await on_published()
+                    except Exception as e:
+                        logger.error(f"Post-publish callback for {job.get('platform_job_id')} failed: {e}")
+
+            self.published += len(fresh)
+            logger.info(f"Pushed {len(fresh)} jobs to {self.queue_name} ({len(batch) - len(fresh)} duplicates skipped)")
+            return len(fresh)
+
+    async def close(self):
+        """Stop the flush timer and publish whatever is still buffered."""
+        if self._timer:
+            self._timer.cancel()
+            try:
+                await self._timer
+            except asyncio.CancelledError:
+                pass
+            self._timer = None
+        # Don't hold up shutdown on a backed-up queue; at most one batch goes over the watermark
+        await self.flush(throttle=False)
+        await self.queue.close()
+        if self.gate and self.gate.throttle_events:
+            logger.info(f"Backpressure on {self.queue_name}: {self.gate.stats()}")
@@ -0,0 +1,176 @@
+import asyncio
+import json
+import logging
+import os
+from contextlib import AsyncExitStack
+from typing import Awaitable, Callable, List, Set
+from arq import Retry, cron
+from arq.connections import RedisSettings
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.database.config import get_engine
+from src.queues.arq_queue import ArqQueue, arq_health_check_key, arq_queue_name
+
+logger = logging.getLogger(__name__)
+
+# Workers for QUEUE_TRANSPORT=arq, so producers enqueue arq jobs instead of queue items:
+#   arq src.worker.IntelligenceWorker   # process_job from raw_job_queue, plus scheduled scouting
+#   arq src.worker.AgentWorker          # process_application from apply_queue
+# Run as many of each per node as the hardware allows; max_jobs sets concurrency within one process.
+
+REDIS_SETTINGS = RedisSettings.from_dsn(os.getenv("REDIS_URL", "redis://localhost:6379/0"))
+MAX_TRIES = int(os.getenv("QUEUE_MAX_ATTEMPTS", 5))
+KEEP_RESULT_SECONDS = int(os.getenv("ARQ_KEEP_RESULT_SECONDS", 3600))
+HEALTH_CHECK_INTERVAL = int(os.getenv("ARQ_HEALTH_CHECK_SECONDS", 30))
+
+def _run_timeout(job_timeout: float) -> float:
+    # Time out just before arq does: arq never retries its own timeouts, so they'd bypass the dead letters
+    return job_timeout - min(15.0, job_timeout * 0.1)
+
+async def _attempt(ctx: dict, queue: ArqQueue, payload: str, run: Callable[[], Awaitable[None]], job_timeout: float):
+    """Retry failures and timeouts with exponential backoff; dead-letter the payload once it is out of tries."""
+    attempt = ctx["job_try"]
+    if attempt > MAX_TRIES:
+        # arq allows one extra try (max_tries = MAX_TRIES + 1) so a job whose last try never finished,
+        # because its worker died, reaches us here instead of failing with "max retries exceeded"
+        await queue.dead_letter(ctx["job_id"], payload, attempt - 1, "worker died or was cancelled on the last try")
+        return
+
+    try:
+        await asyncio.wait_for(run(), _run_timeout(job_timeout))
+    except asyncio.CancelledError:
+        # Worker shutdown; arq runs the job again later. On the last try that run would only
+        # dead-letter it, so do it now and let the job finish
+        if attempt >= MAX_TRIES:
+            await asyncio.shield(queue.dead_letter(ctx["job_id"], payload, attempt, "cancelled on the last try"))
+            return
+        raise
+    except Exception as e:
+        if attempt >= MAX_TRIES:
+            await queue.dead_letter(ctx["job_id"], payload, attempt, repr(e))
+            raise
+        delay = min(queue.backoff_base * 2 ** (attempt - 1), queue.backoff_max)
+        logger.warning(f"Retrying {queue.name} job {ctx['job_id']} in {delay:.0f}s (attempt {attempt + 1}/{MAX_TRIES}): {e!r}")
+        raise Retry(defer=delay) from e
+
+async def process_job(ctx: dict, payload: str):
+    processor = ctx["processor"]
+
+    async def run():
+        try:
+            # Hold off while the agent stage is backed up, but never long enough to time the job out
+            await asyncio.wait_for(processor.apply_gate.wait(), ctx["max_backpressure_wait"])
+        except asyncio.TimeoutError:
+            logger.warning("apply_queue is still over its high watermark; processing anyway")
+        await processor.process_job(json.loads(payload))
+
+    await _attempt(ctx, ctx["dead_letters"], payload, run, IntelligenceWorker.job_timeout)
+
+async def process_application(ctx: dict, payload: str):
+    runner = ctx["agent"]
+    await _attempt(
+        ctx, ctx["dead_letters"], payload, lambda: runner.process_application(int(payload)), AgentWorker.job_timeout
+    )
+
+async def scout_jobs(ctx: dict):
+    """Run the SCOUT_QUERIES searches with the SCOUT_BACKEND scout ("guest" or "browser")."""
+    from src.scout.models import SearchQuery
+
+    searches = [SearchQuery(**query) for query in json.loads(os.getenv("SCOUT_QUERIES", "[]"))]
+    if os.getenv("SCOUT_BACKEND", "guest") == "browser":
+        from src.scout.linkedin import LinkedInScout
+        scout = LinkedInScout(headless=True)
+    else:
+        from src.scout.guest import LinkedInGuestScout
+        scout = LinkedInGuestScout()
+    try:
+        jobs = await scout.search_many(searches)
+    finally:
+        await scout.close()
+    logger.info(f"Scheduled scout found {len(jobs)} jobs across {len(searches)} searches")
+    return len(jobs)
+
+def _minutes(value: str) -> Set[int]:
+    return {int(minute) for minute in value.split(",") if minute.strip()}
+
+def _scout_cron() -> List:
+    """Scout on SCOUT_CRON_MINUTES past every hour (default 0,30) when SCOUT_QUERIES is set."""
+    if not os.getenv("SCOUT_QUERIES"):
+        return []
+    # unique: with several workers on the schedule, only one of them runs each scout
+    return [cron(
+        scout_jobs,
+        minute=_minutes(os.getenv("SCOUT_CRON_MINUTES", "0,30")),
+        timeout=int(os.getenv("SCOUT_TIMEOUT_SECONDS", 1800)),
+        unique=True,
+    )]
+
+async def startup_intelligence(ctx: dict):
+    # Imported here so an agent-only node never loads the workflow stack
+    from src.intelligence.checkpoint import open_checkpointer
+    from src.intelligence.runner import JobProcessor
+
+    stack = AsyncExitStack()
+    processor = JobProcessor(concurrency=IntelligenceWorker.max_jobs)
+    checkpointer = await stack.enter_async_context(open_checkpointer())
+    if checkpointer:
+        processor.workflow.use_checkpointer(checkpointer)
+    get_engine()
+    ctx.update(
+        stack=stack,
+        processor=processor,
+        dead_letters=ArqQueue.from_env(processor.redis, "raw_job_queue"),
+        max_backpressure_wait=IntelligenceWorker.job_timeout / 2,
+    )
+    logger.info(f"Intelligence worker ready: max_jobs={IntelligenceWorker.max_jobs}")
+
+async def shutdown_intelligence(ctx: dict):
+    # Closing the processor closes the Redis client dead_letters shares
+    await ctx["processor"].close()
+    await ctx["stack"].aclose()
+    await get_engine().dispose()
+
+async def startup_agent(ctx: dict):
+    from src.agent.runner import AgentRunner
+
+    runner = AgentRunner(fillers=AgentWorker.max_jobs)
+    await runner.start()
+    get_engine()
+    ctx.update(agent=runner, dead_letters=ArqQueue.from_env(runner.redis, "apply_queue"))
+    logger.info(f"Agent worker ready: max_jobs={AgentWorker.max_jobs}")
+
+async def shutdown_agent(ctx: dict):
+    await ctx["agent"].close()
+    await get_engine().dispose()
+
+class IntelligenceWorker:
+    functions = [process_job]
+    cron_jobs = _scout_cron()
+    queue_name = arq_queue_name("raw_job_queue")
+    redis_settings = REDIS_SETTINGS
+    on_startup = startup_intelligence
+    on_shutdown = shutdown_intelligence
+    # Jobs spend most of their time waiting on LLM calls, so one process can run many
+    max_jobs = int(os.getenv("WORKER_CONCURRENCY", 8))
+    job_timeout = int(os.getenv("JOB_TIMEOUT_SECONDS", 600))
+    max_tries = MAX_TRIES + 1
+    keep_result = KEEP_RESULT_SECONDS
+    health_check_interval = HEALTH_CHECK_INTERVAL
+    health_check_key = arq_health_check_key("raw_job_queue")
+
+class AgentWorker:
+    functions = [process_application]
+    queue_name = arq_queue_name("apply_queue")
+    redis_settings = REDIS_SETTINGS
+    on_startup = startup_agent
+    on_shutdown = shutdown_agent
+    # One browser per concurrent application
+    max_jobs = int(os.getenv("AGENT_CONCURRENCY", 1))
+    # Applications wait on human review, so give them far longer than a fit analysis
+    job_timeout = int(os.getenv("AGENT_JOB_TIMEOUT_SECONDS", 3600))
+    max_tries = MAX_TRIES + 1
+    keep_result = KEEP_RESULT_SECONDS
+    health_check_interval = HEALTH_CHECK_INTERVAL
+    health_check_key = arq_health_check_key("apply_queue")
@@ -0,0 +1,26 @@
+from pathlib import Path
+from src.scout.cards import parse_cards_html
+
+FIXTURE = Path(__file__).parent / "fixtures" / "guest_cards.html"
+
+def test_guest_fragment_cards():
+    jobs = parse_cards_html(FIXTURE.read_text())
+    # The card with neither a URN nor a link has no id and is dropped
+    assert [job["platform_job_id"] for job in jobs] == ["3912345678", "3987654321"]
+
+    first = jobs[0]
+    assert first["title"] == "Senior Python Engineer"
+    assert first["company"] == "Acme Corp"
+    assert first["location"] == "San Francisco, CA"
+    assert first["posted_at"] == "2024-05-01"
+    # Tracking parameters are stripped from the URL
+    assert first["url"] == "https://www.linkedin.com/jobs/view/senior-python-engineer-at-acme-3912345678"
+
+def test_card_without_urn_falls_back_to_url():
+    second = parse_cards_html(FIXTURE.read_text())[1]
+    assert second["platform_job_id"] == "3987654321"
+    assert second["location"] is None
+    assert second["posted_at"] is None
+
+def test_empty_page():
+    assert parse_cards_html("") == []
@@ -0,0 +1,72 @@
+import asyncio
+import httpx
+from src.scout.guest import LinkedInGuestScout
+from src.scout.models import SearchQuery
+
+CARD = """
+<li><div class="base-card" data-entity-urn="urn:li:jobPosting:{job_id}">
+  <a class="base-card__full-link" href="https://www.linkedin.com/jobs/view/job-{job_id}?trk=x"></a>
+  <h3 class="base-search-card__title">Engineer {job_id}</h3>
+  <h4 class="base-search-card__subtitle">Acme</h4>
+</div></li>
+"""
+# Promoted cards without a URN or link are dropped by the parser but still take a slot on the page
+PROMOTED = '<li><div class="base-card"><h3 class="base-search-card__title">Promoted</h3></div></li>'
+
+class RecordingPublisher:
+    def __init__(self):
+        self.jobs = []
+
+    async def add(self, job_data, on_published=None):
+        self.jobs.append(job_data)
+
+    async def close(self):
+        pass
+
+def page(job_ids, promoted=0):
+    return "".join(CARD.format(job_id=job_id) for job_id in job_ids) + PROMOTED * promoted
+
+def run_scout(pages, limit=100, rate_limited_first=True):
+    requests = []
+    rate_limited = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        start = int(request.url.params["start"])
+        requests.append(start)
+        if rate_limited_first and not rate_limited:
+            rate_limited.append(start)
+            return httpx.Response(429)
+        return httpx.Response(200, text=pages.get(start, ""))
+
+    async def scrape():
+        scout = LinkedInGuestScout(transport=httpx.MockTransport(handler), retry_base_delay=0)
+        scout.publisher = RecordingPublisher()
+        try:
+            # Non-incremental, so no cursor is read from Redis
+            search = SearchQuery(keywords="python", location="remote", limit=limit, incremental=False)
+            found = [job async for job in scout._scrape_results(search)]
+        finally:
+            await scout.close()
+        return found, scout.publisher.jobs
+
+    found, pushed = asyncio.run(scrape())
+    return requests, found, pushed
+
+def test_pages_by_fixed_offset_until_empty_page():
+    pages = {
+        0: page(range(1000, 1023), promoted=2),
+        25: page(range(2000, 2003)),
+    }
+    requests, found, pushed = run_scout(pages)
+
+    # 429 retried, then paged by PAGE_SIZE even though only 23 of the first 25 cards parsed,
+    # and stopped at the first empty page
+    assert requests == [0, 0, 25, 50]
+    assert len(found) == 26
+    assert [job["platform_job_id"] for job in pushed] == [job["platform_job_id"] for job in found]
+    assert pushed[0]["url"] == "https://www.linkedin.com/jobs/view/job-1000"
+
+def test_stops_at_limit():
+    requests, found, pushed = run_scout({0: page(range(1000, 1025))}, limit=5, rate_limited_first=False)
+    assert requests == [0]
+    assert len(found) == len(pushed) == 5
@@ -0,0 +1,27 @@
+from src.intelligence.preprocess import strip_boilerplate
+
+POSTING = """About Acme Corp:
+Acme builds rockets and has offices on three continents.
+About you:
+5+ years of Python and distributed systems.
+About the candidate
+You have shipped FastAPI services to production.
+About your background
+Experience with AWS and Docker.
+Benefits:
+Unlimited PTO and a 401(k) match.
+Responsibilities:
+Own the job ingestion pipeline.
+"""
+
+def test_about_company_is_dropped():
+    text = strip_boilerplate(POSTING)
+    assert "Acme builds rockets" not in text
+    assert "Unlimited PTO" not in text
+
+def test_about_you_sections_are_kept():
+    text = strip_boilerplate(POSTING)
+    assert "5+ years of Python" in text
+    assert "shipped FastAPI services" in text
+    assert "AWS and Docker" in text
+    assert "Own the job ingestion pipeline." in text